@@ -0,0 +1,487 @@
+"""
+Benchmark Harness - Text Pattern Matcher
+
+Times the public extraction, validation, replacement and analysis functions
+of the text pattern matcher over deterministic synthetic corpora, with a case
+per performance option, and writes the results as JSON so runs can be
+compared.
+
+Usage:
+    python benchmark.py --size 1000000 --density 0.05 --output bench.json
+    python benchmark.py --compare bench.json --filter extract_
+    python benchmark.py --worst-case --min-throughput 5
+
+Only the standard library is required.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import pathlib
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from functools import partial
+
+import skeleton as analyzer
+
+# Well-formed examples of every pattern type, including all four phone
+# formats and both date formats
+MATCH_GENERATORS = {
+    "email": lambda rng: (
+        f"{rng.choice(['john', 'a.b', 'user+tag', 'x_y%z'])}{rng.randint(0, 999)}"
+        f"@{rng.choice(['example', 'sub.domain-name', 'mail'])}.{rng.choice(['com', 'org', 'co.uk'])}"
+    ),
+    "phone_parentheses": lambda rng: f"({rng.randint(100, 999)}) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+    "phone_dashes": lambda rng: f"{rng.randint(100, 999)}-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+    "phone_dots": lambda rng: f"{rng.randint(100, 999)}.{rng.randint(100, 999)}.{rng.randint(1000, 9999)}",
+    "phone_spaces": lambda rng: f"{rng.randint(100, 999)} {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+    "us_date": lambda rng: f"{rng.randint(1, 12)}/{rng.randint(1, 28):02d}/{rng.randint(1990, 2030)}",
+    "iso_date": lambda rng: f"{rng.randint(1990, 2030)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28)}",
+    "ip": lambda rng: ".".join(str(rng.randint(0, 255)) for _ in range(4)),
+}
+
+# Adversarial near-misses: inputs that start like a match and fail late,
+# plus long runs that make backtracking patterns retry at every offset
+NEAR_MISS_GENERATORS = {
+    "email_no_tld": lambda rng: f"user{rng.randint(0, 999)}@localhost",
+    "email_no_at": lambda rng: "a.b-c_d" * rng.randint(5, 40),
+    "phone_short": lambda rng: f"{rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+    "date_long_year": lambda rng: f"{rng.randint(1, 12)}/{rng.randint(1, 28)}/{rng.randint(10000, 99999)}",
+    "ip_three_octets": lambda rng: f"{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}",
+    "ip_out_of_range": lambda rng: f"{rng.randint(256, 999)}.1.1.{rng.randint(256, 999)}",
+    "digit_run": lambda rng: "".join(rng.choice("0123456789") for _ in range(rng.randint(20, 200))),
+}
+
+# Worst-case numeric inputs for the phone and date extractors: digit groups
+# and separators that make the regex re-attempt a match at every digit,
+# plus dense runs that leave the digit-run scanner nothing to skip
+WORST_CASE_GENERATORS = {
+    "digit_groups": lambda rng: f"{rng.randint(100, 999)} {rng.randint(100, 999)} {rng.randint(100, 999)}",
+    "parenthesized_groups": lambda rng: f"({rng.randint(100, 999)}){rng.randint(100, 999)}-{rng.randint(100, 999)}",
+    "dotted_groups": lambda rng: f"{rng.randint(100, 999)}.{rng.randint(100, 999)}.{rng.randint(100, 999)}.",
+    "hex_dump": lambda rng: " ".join(f"{rng.getrandbits(16):04x}" for _ in range(8)),
+    "csv_numbers": lambda rng: ",".join(str(rng.randint(0, 99999)) for _ in range(6)) + "\n",
+    "tracking_ids": lambda rng: f"1Z{rng.randint(10 ** 15, 10 ** 16 - 1)}",
+    "digit_run": NEAR_MISS_GENERATORS["digit_run"],
+    "slash_runs": lambda rng: "/".join(str(rng.randint(1, 99)) for _ in range(8)),
+    "long_year_dates": NEAR_MISS_GENERATORS["date_long_year"],
+    "iso_near_misses": lambda rng: f"{rng.randint(1000, 9999)}-{rng.randint(100, 999)}-{rng.randint(100, 999)}",
+}
+
+FILLER_WORDS = (
+    "the quick brown fox jumps over lazy dog message server report please "
+    "contact call update released meeting notes attached regards"
+).split()
+
+def generate_corpus(size, density=0.05, near_miss_density=0.02, seed=0):
+    """
+    Generate a deterministic synthetic corpus.
+
+    Parameters:
+    size (int): Approximate length of the corpus in characters
+    density (float): Fraction of tokens that are well-formed matches
+    near_miss_density (float): Fraction of tokens that are near-misses
+    seed (int): Random seed; the same arguments always give the same text
+
+    Returns:
+    str: The generated corpus
+    """
+    rng = random.Random(seed)
+    matches = list(MATCH_GENERATORS.values())
+    near_misses = list(NEAR_MISS_GENERATORS.values())
+    tokens = []
+    length = 0
+    while length < size:
+        roll = rng.random()
+        if roll < density:
+            token = rng.choice(matches)(rng)
+        elif roll < density + near_miss_density:
+            token = rng.choice(near_misses)(rng)
+        else:
+            token = rng.choice(FILLER_WORDS)
+        tokens.append(token)
+        length += len(token) + 1
+    return " ".join(tokens)
+
+def generate_worst_case(size, kind, seed=0):
+    """Generate a deterministic corpus of one WORST_CASE_GENERATORS kind."""
+    rng = random.Random(seed)
+    generator = WORST_CASE_GENERATORS[kind]
+    tokens = []
+    length = 0
+    while length < size:
+        token = generator(rng)
+        tokens.append(token)
+        length += len(token) + 1
+    return " ".join(tokens)
+
+def generate_values(count, generator_names, seed=0):
+    """Generate a deterministic list of candidate values for the validators."""
+    rng = random.Random(seed)
+    generators = {**MATCH_GENERATORS, **NEAR_MISS_GENERATORS}
+    return [generators[rng.choice(generator_names)](rng) for _ in range(count)]
+
+def _run_main():
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer.main()
+
+def _count_from_file(path, iterate):
+    with open(path, encoding="utf-8") as handle:
+        return sum(1 for _ in iterate(handle))
+
+def _mapped_extract(path, kind):
+    with analyzer.MappedFile(path) as mapped:
+        return sum(1 for _ in mapped.iter_spans(kind))
+
+def _replace_each(text, rules):
+    for _, pattern, replacement in rules:
+        text = analyzer.replace_pattern(text, pattern, replacement)
+    return text
+
+def _check_uncached(rules):
+    # The screen memoizes its verdict per pattern; time the analysis itself
+    analyzer._find_unsafe_repeat.cache_clear()
+    for _, pattern, _ in rules:
+        analyzer.check_pattern_safety(pattern)
+
+async def _analyze_all(documents):
+    # Runs on the shared AsyncAnalyzer, whose pool outlives a single call
+    return await asyncio.gather(*(analyzer.analyze(document) for document in documents))
+
+async def _achunks(text, chunk_size=64 * 1024):
+    for start in range(0, len(text), chunk_size):
+        yield text[start:start + chunk_size]
+
+async def _acount(matches):
+    count = 0
+    async for _ in matches:
+        count += 1
+    return count
+
+def _instrumented(name, values):
+    analyzer.enable_instrumentation()
+    try:
+        # Looked up after enabling, so this is the recording wrapper
+        func = getattr(analyzer, name)
+        return [func(value) for value in values]
+    finally:
+        analyzer.disable_instrumentation()
+        analyzer.reset_metrics()
+
+def _run_python(code):
+    # A fresh interpreter, so import costs are measured; subtract the
+    # interpreter_startup case to get the module's own share
+    subprocess.run([sys.executable, "-c", code], check=True,
+                   cwd=os.path.dirname(os.path.abspath(analyzer.__file__)))
+
+def _index_documents(path, documents):
+    index = analyzer.EntityIndex(path)
+    index.add_many(enumerate(documents), workers=1)
+    return index
+
+def _backend_cases(corpus):
+    """Cases for each optional regex backend that is installed."""
+    cases = {}
+    for backend in analyzer.REGEX_BACKENDS:
+        if backend == "re":
+            continue
+        try:
+            analyzer.extract_emails("", backend=backend)
+        except ImportError:
+            continue
+        cases[f"extract_all_backend_{backend}"] = partial(analyzer.extract_all, corpus, backend=backend)
+        cases[f"extract_phone_numbers_backend_{backend}"] = partial(analyzer.extract_phone_numbers, corpus, backend=backend)
+        cases[f"replace_pattern_backend_{backend}"] = partial(
+            analyzer.replace_pattern, corpus, analyzer.EMAIL_PATTERN, "[EMAIL]", backend=backend
+        )
+    return cases
+
+def _main_workflow(text):
+    """The sequence of calls main() makes, run over the benchmark corpus."""
+    for email in analyzer.extract_emails(text):
+        analyzer.validate_email(email)
+    for phone in analyzer.extract_phone_numbers(text):
+        analyzer.validate_phone_number(phone)
+    for date_format in analyzer.DATE_PATTERNS:
+        analyzer.extract_dates(text, date_format)
+    for ip in analyzer.extract_ip_addresses(text):
+        analyzer.validate_ip_address(ip)
+    redacted = analyzer.replace_pattern(text, analyzer.EMAIL_PATTERN, "[EMAIL]")
+    analyzer.replace_pattern(redacted, analyzer.PHONE_PATTERN, "[PHONE]")
+
+# Rules for the single-pass redaction case and its rule-by-rule baseline
+REDACTION_RULES = [
+    ("email", analyzer.EMAIL_PATTERN, "[EMAIL]"),
+    ("phone", analyzer.PHONE_PATTERN, "[PHONE]"),
+    ("ip", r"\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b", "[IP]"),
+    ("ssn", r"\b\d{3}-\d{2}-\d{4}\b", "[SSN]"),
+]
+
+# Documents the corpus is split into for the batch analysis cases
+CORPUS_DOCUMENTS = 64
+
+def build_cases(corpus, values, directory, resources):
+    """
+    Return the benchmark cases as {name: zero-argument callable}.
+
+    Validators are timed over a full list of candidate values per call so
+    their per-value cost is measurable. directory is a scratch directory
+    for cases that read files; the corpus is written there as corpus.txt.
+    Objects the cases keep open are registered with resources, a
+    contextlib.ExitStack.
+    """
+    emails, phones, ips = values["emails"], values["phones"], values["ips"]
+    path = pathlib.Path(directory, "corpus.txt")
+    path.write_text(corpus, encoding="utf-8")
+    step = len(corpus) // CORPUS_DOCUMENTS + 1
+    documents = [corpus[start:start + step] for start in range(0, len(corpus), step)]
+    plain = " ".join(FILLER_WORDS) * (len(corpus) // 500 + 1)
+    redactor = analyzer.Redactor(REDACTION_RULES)
+    dates = analyzer.extract_dates(corpus) * 20
+    index = resources.enter_context(_index_documents(os.path.join(directory, "entities.db"), documents))
+    indexed_emails = analyzer.extract_emails(corpus)
+    cache = resources.enter_context(analyzer.ResultCache(os.path.join(directory, "results.db")))
+    return {
+        "extract_emails": lambda: analyzer.extract_emails(corpus),
+        "extract_emails_instrumented": partial(_instrumented, "extract_emails", [corpus]),
+        "extract_emails_regex": lambda: analyzer.extract_emails(corpus, engine="regex"),
+        "extract_phone_numbers": lambda: analyzer.extract_phone_numbers(corpus),
+        "extract_dates_us": lambda: analyzer.extract_dates(corpus, "MM/DD/YYYY"),
+        "extract_dates_iso": lambda: analyzer.extract_dates(corpus, "YYYY-MM-DD"),
+        "extract_phone_numbers_normalized": lambda: analyzer.extract_phone_numbers(corpus, output="normalized"),
+        "extract_dates_us_normalized": lambda: analyzer.extract_dates(corpus, "MM/DD/YYYY", output="normalized"),
+        "extract_ip_addresses": lambda: analyzer.extract_ip_addresses(corpus),
+        "extract_ip_addresses_valid_only": lambda: analyzer.extract_ip_addresses(corpus, valid_only=True),
+        "extract_all": lambda: analyzer.extract_all(corpus),
+        "iter_emails": lambda: sum(1 for _ in analyzer.iter_emails(io.StringIO(corpus))),
+        "iter_phone_numbers": lambda: sum(1 for _ in analyzer.iter_phone_numbers(io.StringIO(corpus))),
+        "iter_dates_us": lambda: sum(1 for _ in analyzer.iter_dates(io.StringIO(corpus))),
+        "iter_ip_addresses": lambda: sum(1 for _ in analyzer.iter_ip_addresses(io.StringIO(corpus))),
+        "iter_emails_file": lambda: _count_from_file(path, analyzer.iter_emails),
+        "mapped_file_emails": lambda: _mapped_extract(path, "emails"),
+        "mapped_file_phone_numbers": lambda: _mapped_extract(path, "phone_numbers"),
+        "extract_all_plain_text": lambda: analyzer.extract_all(plain),
+        "analyze_document": lambda: analyzer.analyze_document(corpus),
+        "analyze_corpus_in_process": lambda: list(analyzer.analyze_corpus(documents, workers=1)),
+        "analyze_corpus_pool": lambda: list(analyzer.analyze_corpus(documents, workers=2, batch_size=8)),
+        "validate_email": lambda: [analyzer.validate_email(email) for email in emails],
+        "validate_phone_number": lambda: [analyzer.validate_phone_number(phone) for phone in phones],
+        "validate_ip_address": lambda: [analyzer.validate_ip_address(ip) for ip in ips],
+        "validate_ip_address_instrumented": partial(_instrumented, "validate_ip_address", ips),
+        "validate_emails_many": lambda: analyzer.validate_emails_many(emails),
+        "validate_phone_numbers_many": lambda: analyzer.validate_phone_numbers_many(phones),
+        "validate_ip_addresses_many": lambda: analyzer.validate_ip_addresses_many(ips),
+        "replace_pattern": lambda: analyzer.replace_pattern(corpus, analyzer.EMAIL_PATTERN, "[EMAIL]"),
+        "replace_pattern_small": lambda: [analyzer.replace_pattern(document[:200], r"\d+", "#") for document in documents],
+        "extract_ip_addresses_scanner": lambda: analyzer.extract_ip_addresses(corpus, engine="scanner"),
+        "extract_ip_addresses_valid_only_scanner": lambda: analyzer.extract_ip_addresses(corpus, True, "scanner"),
+        "scan_ip_addresses": lambda: analyzer.scan_ip_addresses(corpus),
+        "validate_ip_address_scanner": lambda: [analyzer.validate_ip_address(ip, engine="scanner") for ip in ips],
+        "extract_ip_addresses_int": lambda: analyzer.extract_ip_addresses(corpus, output="int"),
+        "extract_phone_numbers_int": lambda: analyzer.extract_phone_numbers(corpus, output="int"),
+        "extract_dates_us_int": lambda: analyzer.extract_dates(corpus, "MM/DD/YYYY", output="int"),
+        "scan_ip_addresses_packed": lambda: analyzer.scan_ip_addresses(corpus, packed=True),
+        "extract_emails_spans": lambda: len(analyzer.extract_emails_spans(corpus)),
+        "extract_phone_numbers_spans": lambda: len(analyzer.extract_phone_numbers_spans(corpus)),
+        "extract_dates_us_spans": lambda: len(analyzer.extract_dates_spans(corpus)),
+        "extract_ip_addresses_spans": lambda: len(analyzer.extract_ip_addresses_spans(corpus)),
+        "redactor": lambda: redactor.redact(corpus),
+        "replace_pattern_per_rule": lambda: _replace_each(corpus, REDACTION_RULES),
+        "check_pattern_safety": lambda: [analyzer.check_pattern_safety(rule[1]) for rule in REDACTION_RULES],
+        "check_pattern_safety_uncached": lambda: _check_uncached(REDACTION_RULES),
+        "replace_pattern_unscreened": lambda: analyzer.replace_pattern(corpus, analyzer.EMAIL_PATTERN, "[EMAIL]",
+                                                                       allow_unsafe=True),
+        "replace_pattern_timeout": lambda: analyzer.replace_pattern(corpus, analyzer.EMAIL_PATTERN, "[EMAIL]", timeout=10),
+        "count_emails": lambda: analyzer.count_emails(corpus),
+        "count_phone_numbers": lambda: analyzer.count_phone_numbers(corpus),
+        "count_ip_addresses": lambda: analyzer.count_ip_addresses(corpus),
+        "counter_of_extract_emails": lambda: Counter(analyzer.extract_emails(corpus)),
+        "summarize_emails": lambda: analyzer.summarize(io.StringIO(corpus), "emails"),
+        "stream_summary_update": lambda: analyzer.StreamSummary().update(emails),
+        "async_analyze": lambda: asyncio.run(_analyze_all(documents)),
+        "aiter_emails": lambda: asyncio.run(_acount(analyzer.aiter_emails(_achunks(corpus)))),
+        "extract_dates_iso_normalized": lambda: analyzer.extract_dates(corpus, "YYYY-MM-DD", output="normalized"),
+        "normalize_phone_number": lambda: [analyzer.normalize_phone_number(phone) for phone in phones],
+        "normalize_date": lambda: [analyzer.normalize_date(date) for date in dates],
+        "interpreter_startup": partial(_run_python, "pass"),
+        "import_module": partial(_run_python, f"import {analyzer.__name__}"),
+        "extract_phone_numbers_regex": lambda: analyzer.extract_phone_numbers(corpus, engine="regex"),
+        "extract_dates_us_regex": lambda: analyzer.extract_dates(corpus, "MM/DD/YYYY", engine="regex"),
+        "extract_dates_iso_regex": lambda: analyzer.extract_dates(corpus, "YYYY-MM-DD", engine="regex"),
+        "entity_index_add_many": lambda: _index_documents(":memory:", documents).close(),
+        "entity_index_lookup": lambda: [index.lookup("emails", email) for email in indexed_emails],
+        "result_cache_hit": lambda: cache.run(analyzer.extract_all, corpus),
+        "result_cache_miss": lambda: (cache.clear(), cache.run(analyzer.extract_all, corpus)),
+        **_backend_cases(corpus),
+        "main": _run_main,
+        "main_workflow": lambda: _main_workflow(corpus),
+    }
+
+def time_case(func, repeat, min_time=0.05):
+    """
+    Time func and return summary statistics in seconds per call.
+
+    Each of the repeat samples runs func enough times to last at least
+    min_time, so very fast cases are not dominated by timer resolution.
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2
+    samples = [elapsed / loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - start) / loops)
+    return {
+        "loops": loops,
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "max": max(samples),
+        "samples": samples,
+    }
+
+def run_benchmarks(size=200_000, density=0.05, near_miss_density=0.02, seed=0,
+                   values=10_000, repeat=5, name_filter=None):
+    """
+    Run every benchmark case and return a JSON-serializable result dict.
+
+    Parameters:
+    size (int): Corpus length in characters
+    density (float): Fraction of corpus tokens that are matches
+    near_miss_density (float): Fraction of corpus tokens that are near-misses
+    seed (int): Seed for corpus and value generation
+    values (int): Number of candidate values per validator case
+    repeat (int): Timing samples per case
+    name_filter (str): Only run cases whose name contains this substring
+
+    Returns:
+    dict: Run configuration, environment and per-case timings
+    """
+    corpus = generate_corpus(size, density, near_miss_density, seed)
+    candidates = {
+        "emails": generate_values(values, ["email", "email_no_tld", "email_no_at"], seed),
+        "phones": generate_values(values, ["phone_parentheses", "phone_dashes", "phone_dots",
+                                           "phone_spaces", "phone_short"], seed),
+        "ips": generate_values(values, ["ip", "ip_three_octets", "ip_out_of_range"], seed),
+    }
+    results = {}
+    with tempfile.TemporaryDirectory() as directory, contextlib.ExitStack() as resources:
+        for name, func in build_cases(corpus, candidates, directory, resources).items():
+            if name_filter and name_filter not in name:
+                continue
+            results[name] = time_case(func, repeat)
+    return {
+        "config": {
+            "size": size,
+            "density": density,
+            "near_miss_density": near_miss_density,
+            "seed": seed,
+            "values": values,
+            "repeat": repeat,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+def run_worst_case(size=1_000_000, seed=0, repeat=3):
+    """
+    Measure phone and date extraction throughput on every worst-case corpus.
+
+    Returns:
+    dict: {kind: {"<case>/<engine>": megabytes (million characters) per second}}
+    """
+    cases = {
+        "extract_phone_numbers": lambda text, engine: analyzer.extract_phone_numbers(text, engine=engine),
+        "extract_dates_us": lambda text, engine: analyzer.extract_dates(text, "MM/DD/YYYY", engine=engine),
+        "extract_dates_iso": lambda text, engine: analyzer.extract_dates(text, "YYYY-MM-DD", engine=engine),
+    }
+    results = {}
+    for kind in WORST_CASE_GENERATORS:
+        text = generate_worst_case(size, kind, seed)
+        results[kind] = {
+            f"{name}/{engine}": len(text) / 1e6 / time_case(partial(func, text, engine), repeat)["min"]
+            for name, func in cases.items()
+            for engine in ("regex", "scanner")
+        }
+    return results
+
+def throughput_floor(results):
+    """Return the lowest scanner throughput and the kind and case it was measured on."""
+    return min(
+        (rate, kind, case)
+        for kind, rates in results.items()
+        for case, rate in rates.items()
+        if case.endswith("/scanner")
+    )
+
+def compare(baseline, current):
+    """Return {case: current median / baseline median} for cases in both runs."""
+    return {
+        name: current["results"][name]["median"] / timing["median"]
+        for name, timing in baseline["results"].items()
+        if name in current["results"] and timing["median"] > 0
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the text pattern matcher.")
+    parser.add_argument("--size", type=int, default=200_000, help="corpus length in characters")
+    parser.add_argument("--density", type=float, default=0.05, help="fraction of tokens that are matches")
+    parser.add_argument("--near-miss-density", type=float, default=0.02, help="fraction of tokens that are near-misses")
+    parser.add_argument("--seed", type=int, default=0, help="seed for corpus generation")
+    parser.add_argument("--values", type=int, default=10_000, help="candidate values per validator case")
+    parser.add_argument("--repeat", type=int, default=5, help="timing samples per case")
+    parser.add_argument("--filter", dest="name_filter", help="only run cases containing this substring")
+    parser.add_argument("--output", help="write JSON results to this file instead of stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="print ratios against a previous JSON result")
+    parser.add_argument("--worst-case", action="store_true",
+                        help="measure phone and date throughput on worst-case numeric corpora instead")
+    parser.add_argument("--min-throughput", type=float, metavar="MBPS",
+                        help="with --worst-case, exit with status 1 if the scanner falls below this rate")
+    args = parser.parse_args(argv)
+
+    if args.worst_case:
+        results = run_worst_case(args.size, args.seed, args.repeat)
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        rate, kind, case = throughput_floor(results)
+        print(f"scanner floor: {rate:.1f} MB/s ({case} on {kind})", file=sys.stderr)
+        if args.min_throughput is not None and rate < args.min_throughput:
+            sys.exit(1)
+        return
+
+    report = run_benchmarks(args.size, args.density, args.near_miss_density, args.seed,
+                            args.values, args.repeat, args.name_filter)
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+        for name, ratio in compare(baseline, report).items():
+            print(f"{name:36} {ratio:6.2f}x", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
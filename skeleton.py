@@ -5,15 +5,363 @@ This program demonstrates basic pattern matching with regular expressions
 to extract and validate common data formats like emails, phone numbers, and dates.
 """
 
+import codecs
+import heapq
+import importlib
+import math
+import os
 import re
-from datetime import datetime
+import threading
+import weakref
+from array import array
+from bisect import bisect_left
+from collections import Counter, OrderedDict, deque
+from functools import lru_cache, partial, wraps
+from itertools import chain, islice, starmap
+from time import perf_counter
 
-def extract_emails(text):
+# Built-in patterns shared by the individual extractors and extract_all()
+EMAIL_PATTERN = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+PHONE_PATTERN = r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
+US_DATE_PATTERN = r'\b\d{1,2}/\d{1,2}/\d{4}\b'
+ISO_DATE_PATTERN = r'\b\d{4}-\d{1,2}-\d{1,2}\b'
+IP_PATTERN = r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b'
+# IP_PATTERN with each octet captured, for range checks straight from a match
+IP_OCTETS_PATTERN = r'\b(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})\b'
+# Digit groups of the phone and date patterns, for the integer output modes
+PHONE_GROUPS_PATTERN = r'\(?(\d{3})\)?[-.\s]?(\d{3})[-.\s]?(\d{4})'
+US_DATE_GROUPS_PATTERN = r'\b(\d{1,2})/(\d{1,2})/(\d{4})\b'
+ISO_DATE_GROUPS_PATTERN = r'\b(\d{4})-(\d{1,2})-(\d{1,2})\b'
+
+# Anchored variants used by the validators
+EMAIL_VALIDATION_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+PHONE_VALIDATION_PATTERN = r'^\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}$'
+IP_VALIDATION_PATTERN = r'^(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})$'
+
+# One valid IPv4 per line, octet range included, for validate_ip_addresses_many()
+_OCTET = r'(?:[01]?[0-9]?[0-9]|2[0-4][0-9]|25[0-5])'
+IP_LINES_PATTERN = rf'(?m)^{_OCTET}\.{_OCTET}\.{_OCTET}\.{_OCTET}$'
+
+# Sources of the built-in patterns, by registry name
+PATTERN_SOURCES = {
+    "email": EMAIL_PATTERN,
+    "phone": PHONE_PATTERN,
+    "us_date": US_DATE_PATTERN,
+    "iso_date": ISO_DATE_PATTERN,
+    "ip": IP_PATTERN,
+    "ip_octets": IP_OCTETS_PATTERN,
+    "phone_groups": PHONE_GROUPS_PATTERN,
+    "us_date_groups": US_DATE_GROUPS_PATTERN,
+    "iso_date_groups": ISO_DATE_GROUPS_PATTERN,
+    "email_validation": EMAIL_VALIDATION_PATTERN,
+    "phone_validation": PHONE_VALIDATION_PATTERN,
+    "ip_validation": IP_VALIDATION_PATTERN,
+    "ip_lines": IP_LINES_PATTERN,
+}
+
+class _PatternRegistry(dict):
+    """Dict of compiled patterns that compiles each entry on first lookup."""
+
+    def __init__(self, compile=re.compile):
+        super().__init__()
+        self._compile = compile
+
+    def __missing__(self, name):
+        # setdefault keeps one compiled object even if two threads race here
+        return self.setdefault(name, self._compile(PATTERN_SOURCES[name]))
+
+# Registry of the built-in patterns. Each is compiled once, on first use, so
+# importing the module compiles nothing and hot callers never depend on the
+# re module's shared cache (which ad-hoc patterns passed to replace_pattern
+# can evict).
+PATTERNS = _PatternRegistry()
+
+@lru_cache(maxsize=None)
+def _compiled(source):
+    """Compile an internal helper pattern on first use."""
+    return re.compile(source)
+
+@lru_cache(maxsize=None)
+def _deferred(module, name):
+    """Import module.name on first use, keeping it off the import path."""
+    return getattr(importlib.import_module(module), name)
+
+# Regex engines the extractors, validators and replace_pattern() can run
+# on: the module implementing each and whether it guarantees linear-time
+# matching. "re" is always available; "re2" (the google-re2 package) and
+# "regex" are used when installed.
+REGEX_BACKENDS = {
+    "re": ("re", False),
+    "re2": ("re2", True),
+    "regex": ("regex", False),
+}
+
+class _RegexBackend:
+    """A regex engine with its own registry of built-in patterns."""
+
+    def __init__(self, name, module, linear):
+        self.name = name
+        self.module = module
+        self.linear = linear
+        # The stdlib backend shares PATTERNS and PATTERN_CACHE, and only it
+        # runs the hand-written scanners, which are tuned to the re module
+        self.native = module is re
+        self.patterns = PATTERNS if self.native else _PatternRegistry(module.compile)
+        self._cache = None
+
+    def compile(self, pattern, check=None):
+        """Compile a user-supplied pattern through this backend's PatternCache."""
+        if self.native or isinstance(pattern, re.Pattern):
+            return PATTERN_CACHE.get(pattern, check)
+        if self._cache is None:
+            self._cache = PatternCache(compile=self.module.compile)
+        return self._cache.get(pattern, check)
+
+_BACKENDS = {}
+_BACKENDS_LOCK = threading.Lock()
+_DEFAULT_BACKEND = "re"
+
+def register_regex_backend(name, module, linear=False):
+    """
+    Make a regex engine available as a backend.
+
+    Parameters:
+    name (str): Name for set_regex_backend() and backend= arguments
+    module: The engine, providing compile(pattern) and an error exception
+            class, with compiled patterns that follow the re module's API
+            (match, fullmatch, search, findall, finditer and sub)
+    linear (bool): The engine guarantees linear-time matching, so
+                   replace_pattern() can skip its backtracking screen
+
+    Example:
+    >>> import regex
+    >>> register_regex_backend("regex-v1", regex)
+    """
+    if not isinstance(name, str):
+        raise TypeError("Backend name must be a string")
+    if not callable(getattr(module, "compile", None)) or not hasattr(module, "error"):
+        raise TypeError("Backend module must provide compile() and error")
+    with _BACKENDS_LOCK:
+        _BACKENDS[name] = _RegexBackend(name, module, bool(linear))
+
+def unregister_regex_backend(name):
+    """
+    Remove a backend added with register_regex_backend().
+
+    Parameters:
+    name (str): The name it was registered under
+
+    Notes:
+    - Raises ValueError for names that are not registered and for the
+      current default backend
+    - A built-in name ("re2", "regex") reverts to its own module on next use
+    """
+    with _BACKENDS_LOCK:
+        if name == _DEFAULT_BACKEND:
+            raise ValueError(f"Cannot unregister the default regex backend: {name}")
+        if _BACKENDS.pop(name, None) is None:
+            raise ValueError(f"Unknown regex backend: {name}")
+
+def _get_backend(name=None):
+    """Return the backend called name, or the default one, importing it on first use."""
+    if name is None:
+        name = _DEFAULT_BACKEND
+    backend = _BACKENDS.get(name)
+    if backend is not None:
+        return backend
+    if name not in REGEX_BACKENDS:
+        raise ValueError(f"Unsupported regex backend: {name}")
+    module_name, linear = REGEX_BACKENDS[name]
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError:
+        raise ImportError(f"Regex backend '{name}' requires the {module_name} module to be installed") from None
+    with _BACKENDS_LOCK:
+        return _BACKENDS.setdefault(name, _RegexBackend(name, module, linear))
+
+def set_regex_backend(name):
+    """
+    Choose the regex backend used when a call does not pass backend=.
+
+    Parameters:
+    name (str): "re" (the default), "re2", "regex", or a name given to
+                register_regex_backend()
+
+    Notes:
+    - Raises ImportError if the backend's module is not installed
+    - Non-stdlib backends always run the pattern directly: the scanner
+      engines, extract_all()'s combined scan and precompiled re.Pattern
+      arguments stay on the re module
+    - RE2's \\d, \\s, \\w and \\b are ASCII-only and its $ does not match
+      before a trailing newline, so results can differ from re on such input
+    """
+    global _DEFAULT_BACKEND
+    _get_backend(name)
+    _DEFAULT_BACKEND = name
+
+def get_regex_backend():
+    """Return the name of the default regex backend."""
+    return _DEFAULT_BACKEND
+
+# Supported extract_dates() formats and the registry pattern each one uses
+DATE_PATTERNS = {
+    "MM/DD/YYYY": "us_date",
+    "YYYY-MM-DD": "iso_date",
+}
+
+# Longest text each extraction pattern can match; None when unbounded
+MAX_MATCH_LENGTHS = {
+    "email": None,
+    "phone": 14,
+    "us_date": 10,
+    "iso_date": 10,
+    "ip": 15,
+}
+
+def _has_digit(text):
+    return _compiled(r'\d').search(text) is not None
+
+# Cheap necessary conditions for each extraction pattern. The extractors skip
+# the regex entirely when the prefilter rules out any match.
+PREFILTERS = {
+    "email": lambda text: "@" in text,
+    "phone": _has_digit,
+    "us_date": lambda text: "/" in text and _has_digit(text),
+    "iso_date": lambda text: "-" in text and _has_digit(text),
+    "ip": lambda text: "." in text and _has_digit(text),
+}
+
+# Per-pattern prefilter counters; see prefilter_stats()
+PREFILTER_STATS = {name: {"checks": 0, "skipped": 0} for name in PREFILTERS}
+
+def _prefilter(name, text):
+    """Return True when pattern name could match text, counting skips."""
+    stats = PREFILTER_STATS[name]
+    stats["checks"] += 1
+    if PREFILTERS[name](text):
+        return True
+    stats["skipped"] += 1
+    return False
+
+def prefilter_stats():
+    """
+    Return how often each prefilter let the extractors skip the regex.
+
+    Returns:
+    dict: {pattern name: {"checks": int, "skipped": int, "skip_rate": float}}
+
+    Example:
+    >>> extract_emails("no addresses here")
+    []
+    >>> prefilter_stats()["email"]["skipped"]
+    1
+    """
+    return {
+        name: {
+            "checks": stats["checks"],
+            "skipped": stats["skipped"],
+            "skip_rate": stats["skipped"] / stats["checks"] if stats["checks"] else 0.0,
+        }
+        for name, stats in PREFILTER_STATS.items()
+    }
+
+def reset_prefilter_stats():
+    """Reset every prefilter counter to zero."""
+    for stats in PREFILTER_STATS.values():
+        stats["checks"] = stats["skipped"] = 0
+
+# Output modes of the extractors: Python strings, array.array of integers,
+# or a NumPy array sharing the array.array's buffer. Phones and dates also
+# support "normalized" canonical strings.
+OUTPUT_MODES = ("str", "int", "numpy")
+_NORMALIZED_MODES = OUTPUT_MODES + ("normalized",)
+
+# Distinct (year, month, day) match groups memoized by the date converters;
+# real text repeats a small set of dates, and calendar validation is the
+# expensive part
+DATE_MEMO_SIZE = 4096
+
+# array typecodes for the integer output modes
+_UINT32 = "I" if array("I").itemsize == 4 else "L"
+_INT32 = "i" if array("i").itemsize == 4 else "l"
+_INT64 = "q"
+
+_EPOCH_ORDINAL = 719163  # datetime.date(1970, 1, 1).toordinal()
+
+def _check_output(output, modes=OUTPUT_MODES):
+    if output not in modes:
+        raise ValueError(f"Unsupported output mode: {output}")
+
+def _pack(typecode, values, output):
+    """Collect integers into an array.array, or a NumPy view of one."""
+    packed = array(typecode, values)
+    if output == "numpy":
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError('output="numpy" requires NumPy to be installed') from None
+        return numpy.frombuffer(packed, dtype=packed.typecode)
+    return packed
+
+def _phone_to_int(groups):
+    return int("".join(groups))
+
+@lru_cache(maxsize=DATE_MEMO_SIZE)
+def _date_to_days(year, month, day):
+    """Days since 1970-01-01, or None for dates that do not exist."""
+    from datetime import date
+    try:
+        return date(int(year), int(month), int(day)).toordinal() - _EPOCH_ORDINAL
+    except ValueError:
+        return None
+
+@lru_cache(maxsize=DATE_MEMO_SIZE)
+def _iso_date(year, month, day):
+    """Canonical YYYY-MM-DD form, or None for dates that do not exist."""
+    from datetime import date
+    try:
+        return date(int(year), int(month), int(day)).isoformat()
+    except ValueError:
+        return None
+
+def _normalized_dates(name, matches):
+    """ISO forms of the real calendar dates among date match groups."""
+    if name == "us_date":
+        dates = (_iso_date(year, month, day) for month, day, year in matches)
+    else:
+        dates = (_iso_date(year, month, day) for year, month, day in matches)
+    return [date for date in dates if date is not None]
+
+def get_pattern(name):
+    """
+    Return a compiled built-in pattern from the registry.
+
+    Parameters:
+    name (str): Registry name, e.g. "email", "iso_date" or "ip_validation"
+
+    Returns:
+    re.Pattern: The compiled pattern
+
+    Example:
+    >>> get_pattern("ip").findall("Gateway: 10.0.0.1")
+    ['10.0.0.1']
+    """
+    if not isinstance(name, str):
+        raise TypeError("Pattern name must be a string")
+    if name not in PATTERN_SOURCES:
+        raise ValueError(f"Unknown pattern name: {name}")
+    return PATTERNS[name]
+
+def extract_emails(text, engine="scanner", backend=None):
     """
     Extract all email addresses from the given text.
     
     Parameters:
     text (str): The text to search for email addresses
+    engine (str): "scanner" (default) for scan_emails(), or "regex" to run
+                  EMAIL_PATTERN directly
+    backend (str): Regex backend for this call (default: the one chosen
+                   with set_regex_backend())
     
     Returns:
     list: List of all email addresses found
@@ -26,25 +374,37 @@ def extract_emails(text):
     - Should handle special characters in usernames (._%+-) 
     - Should handle subdomains and different TLDs
     - Should extract complex emails like "user.name+tag123@sub.domain-name.co.uk"
+    - Both engines return identical results; the scanner runs in linear
+      time, while the regex engine is quadratic in the length of long runs
+      of username characters such as base64 blobs
     """
-    # TODO: Implement this function
-    # 1. Validate input is a string (raise TypeError if not)
-    # 2. Create a raw string regex pattern to match email addresses
-    #    Hint: Username part can include [a-zA-Z0-9._%+-]
-    #          Domain part can include [a-zA-Z0-9.-]
-    #          TLD requires at least 2 letters: [a-zA-Z]{2,}
-    # 3. Use re.findall() to return all matches
-    pass
+    if not isinstance(text, str):
+        raise TypeError("Input text must be a string")
+    _check_engine(engine)
+    backend = _get_backend(backend)
+    if engine == "scanner" and backend.native:
+        return scan_emails(text)
+    if not _prefilter("email", text):
+        return []
+    return backend.patterns["email"].findall(text)
 
-def extract_phone_numbers(text):
+def extract_phone_numbers(text, output="str", engine="scanner", backend=None):
     """
     Extract all phone numbers from the given text.
     
     Parameters:
     text (str): The text to search for phone numbers
+    output (str): "str" (default), "int" for an int64 array.array of the
+                  10 digits of each number, "numpy" for a NumPy array, or
+                  "normalized" for E.164-style "+1XXXXXXXXXX" strings
+    engine (str): "scanner" (default) to run the regex only near digit runs
+                  that could hold a number (see scan_phone_numbers()), or
+                  "regex" to run PHONE_PATTERN over the whole text
+    backend (str): Regex backend for this call (default: the one chosen
+                   with set_regex_backend())
     
     Returns:
-    list: List of all phone numbers found
+    list: List of all phone numbers found (an array for integer output)
     
     Example:
     >>> extract_phone_numbers("Call (123) 456-7890 or 555-987-6543")
@@ -54,26 +414,49 @@ def extract_phone_numbers(text):
     - Should handle various formats: (123) 456-7890, 123-456-7890, 123.456.7890, 123 456 7890
     - Area code may or may not be in parentheses
     - Separators can be dashes, dots, spaces, or none
+    - Integer and normalized output take the digits straight from the
+      match groups, so "(123) 456-7890" and "123.456.7890" both become
+      1234567890 (or "+11234567890")
+    - Both engines return identical results; the scanner skips numeric
+      text such as "123 456 789" groups, hex dumps and CSV columns that
+      cannot hold a phone number, which the regex re-attempts at every digit
     """
-    # TODO: Implement this function
-    # 1. Validate input is a string (raise TypeError if not)
-    # 2. Create a raw string regex pattern to match phone numbers
-    #    Hint: Area code: \(?\d{3}\)?
-    #          Separators: [-.\s]?
-    #          Rest of number: \d{3}[-.\s]?\d{4}
-    # 3. Use re.findall() to return all matches
-    pass
+    if not isinstance(text, str):
+        raise TypeError("Input text must be a string")
+    _check_output(output, _NORMALIZED_MODES)
+    _check_engine(engine)
+    backend = _get_backend(backend)
+    pattern = "phone" if output == "str" else "phone_groups"
+    if not _prefilter("phone", text):
+        matches = []
+    elif engine == "scanner" and backend.native:
+        matches = _scan_digit_runs("phone", text, pattern)
+    else:
+        matches = backend.patterns[pattern].findall(text)
+    if output == "normalized":
+        return [f"+1{area}{exchange}{line}" for area, exchange, line in matches]
+    if output != "str":
+        return _pack(_INT64, map(_phone_to_int, matches), output)
+    return matches
 
-def extract_dates(text, format="MM/DD/YYYY"):
+def extract_dates(text, format="MM/DD/YYYY", output="str", engine="scanner", backend=None):
     """
     Extract all dates in the specified format from the given text.
     
     Parameters:
     text (str): The text to search for dates
     format (str): The expected date format (MM/DD/YYYY or YYYY-MM-DD)
+    output (str): "str" (default), "int" for an int32 array.array of days
+                  since 1970-01-01, "numpy" for a NumPy array, or
+                  "normalized" for ISO "YYYY-MM-DD" strings
+    engine (str): "scanner" (default) to run the regex only near a
+                  four-digit year (see scan_dates()), or "regex" to run the
+                  format's pattern over the whole text
+    backend (str): Regex backend for this call (default: the one chosen
+                   with set_regex_backend())
     
     Returns:
-    list: List of all dates found
+    list: List of all dates found (an array for integer output)
     
     Example:
     >>> extract_dates("Start: 01/15/2023, End: 12/31/2023")
@@ -86,25 +469,51 @@ def extract_dates(text, format="MM/DD/YYYY"):
     - For MM/DD/YYYY, should match patterns like 1/1/2023, 01/01/2023, etc.
     - For YYYY-MM-DD, should match patterns like 2023-1-1, 2023-01-01, etc.
     - Should raise ValueError for unsupported format parameters
+    - Integer and normalized output skip matches that are not real
+      calendar dates (e.g. 02/30/2023); conversions are memoized per
+      distinct date (DATE_MEMO_SIZE)
+    - Both engines return identical results
     """
-    # TODO: Implement this function
-    # 1. Validate input is a string (raise TypeError if not)
-    # 2. Choose the pattern based on format parameter
-    #    - For MM/DD/YYYY use: \b\d{1,2}/\d{1,2}/\d{4}\b
-    #    - For YYYY-MM-DD use: \b\d{4}-\d{1,2}-\d{1,2}\b
-    #    - Raise ValueError for any other format
-    # 3. Use re.findall() to return all matches
-    pass
+    if not isinstance(text, str):
+        raise TypeError("Input text must be a string")
+    if format not in DATE_PATTERNS:
+        raise ValueError(f"Unsupported date format: {format}")
+    _check_output(output, _NORMALIZED_MODES)
+    _check_engine(engine)
+    backend = _get_backend(backend)
+    name = DATE_PATTERNS[format]
+    pattern = name if output == "str" else name + "_groups"
+    if not _prefilter(name, text):
+        matches = []
+    elif engine == "scanner" and backend.native:
+        matches = _scan_digit_runs(name, text, pattern)
+    else:
+        matches = backend.patterns[pattern].findall(text)
+    if output == "normalized":
+        return _normalized_dates(name, matches)
+    if output != "str":
+        if name == "us_date":
+            days = (_date_to_days(year, month, day) for month, day, year in matches)
+        else:
+            days = (_date_to_days(year, month, day) for year, month, day in matches)
+        return _pack(_INT32, (value for value in days if value is not None), output)
+    return matches
 
-def extract_ip_addresses(text):
+def extract_ip_addresses(text, valid_only=False, engine="regex", output="str", backend=None):
     """
     Extract all IPv4 addresses from the given text.
     
     Parameters:
     text (str): The text to search for IP addresses
+    valid_only (bool): Only return addresses that pass validate_ip_address()
+    engine (str): "regex" (default) or "scanner" for scan_ip_addresses()
+    output (str): "str" (default), "int" for a uint32 array.array, or
+                  "numpy" for a NumPy array
+    backend (str): Regex backend for this call (default: the one chosen
+                   with set_regex_backend())
     
     Returns:
-    list: List of all IPv4 addresses found
+    list: List of all IPv4 addresses found (an array for integer output)
     
     Example:
     >>> extract_ip_addresses("Server: 192.168.1.1, Gateway: 10.0.0.1")
@@ -113,155 +522,3164 @@ def extract_ip_addresses(text):
     Notes:
     - Should match standard IPv4 format (four octets of 1-3 digits separated by dots)
     - Should use word boundaries to avoid matching partial numbers
+    - With valid_only, octets are range-checked from the match groups
+      instead of running validate_ip_address() on each hit
+    - Integer output implies valid_only, since only valid addresses fit
+      in 32 bits
+    """
+    if not isinstance(text, str):
+        raise TypeError("Input text must be a string")
+    _check_engine(engine)
+    _check_output(output)
+    backend = _get_backend(backend)
+    patterns = backend.patterns
+    scanner = engine == "scanner" and backend.native
+    if output != "str":
+        if not _prefilter("ip", text):
+            return _pack(_UINT32, (), output)
+        if scanner:
+            return _pack(_UINT32, scan_ip_addresses(text, packed=True), output)
+        return _pack(_UINT32, _packed_ipv4(patterns["ip_octets"].findall(text)), output)
+    if not _prefilter("ip", text):
+        return []
+    if scanner:
+        return scan_ip_addresses(text, valid_only=valid_only)
+    if valid_only:
+        return [
+            match.group()
+            for match in patterns["ip_octets"].finditer(text)
+            if _octets_in_range(match.groups())
+        ]
+    return patterns["ip"].findall(text)
+
+# Engines accepted by the extractors and validate_ip_address()
+ENGINES = ("regex", "scanner")
+
+def _check_engine(engine):
+    if engine not in ENGINES:
+        raise ValueError(f"Unsupported engine: {engine}")
+
+def _is_word(char):
+    """Match the re module's Unicode \\w for a single character."""
+    return char.isalnum() or char == "_"
+
+def _scan_ipv4(text):
     """
-    # TODO: Implement this function
-    # 1. Validate input is a string (raise TypeError if not)
-    # 2. Create a raw string regex pattern to match IPv4 addresses
-    #    Hint: Use word boundaries \b to ensure you don't match partial numbers
-    #          Pattern: \b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b
-    # 3. Use re.findall() to return all matches
-    pass
+    Yield (start, end, octets) for each match of IP_PATTERN, without regex.
 
-def validate_email(email):
+    Every match contains a dot, so str.find jumps from dot to dot. The first
+    octet is the digit run just before a dot and the rest are split out of
+    the following 12 characters (enough for "ddd.ddd.ddd" plus the boundary
+    character). \\d{1,3} next to a longer digit run can never satisfy the
+    surrounding dots and word boundaries, so each octet must be a whole
+    digit run of length 1-3. Each dot is examined once with a bounded
+    window, so the scan is linear in the length of the text.
     """
-    Validate if a string is a properly formatted email address.
-    
+    length = len(text)
+    resume = 0
+    dot = text.find(".")
+    while dot != -1:
+        start = dot
+        while start > resume and dot - start < 3 and text[start - 1].isdecimal():
+            start -= 1
+        if start < dot and (start == 0 or not _is_word(text[start - 1])):
+            parts = text[dot + 1:dot + 13].split(".", 2)
+            if len(parts) == 3:
+                second, third, rest = parts
+                digits = 0
+                while digits < len(rest) and digits < 4 and rest[digits].isdecimal():
+                    digits += 1
+                end = dot + len(second) + len(third) + digits + 3
+                if (
+                    0 < len(second) <= 3 and second.isdecimal()
+                    and 0 < len(third) <= 3 and third.isdecimal()
+                    and 0 < digits <= 3
+                    and (end == length or not _is_word(text[end]))
+                ):
+                    yield start, end, [text[start:dot], second, third, rest[:digits]]
+                    resume = end
+                    dot = text.find(".", end)
+                    continue
+        dot = text.find(".", dot + 1)
+
+def _packed_ipv4(octet_groups):
+    """Yield each in-range address from (a, b, c, d) strings as a 32-bit integer."""
+    for octets in octet_groups:
+        a, b, c, d = map(int, octets)
+        if a <= 255 and b <= 255 and c <= 255 and d <= 255:
+            yield a << 24 | b << 16 | c << 8 | d
+
+def scan_ip_addresses(text, valid_only=False, packed=False):
+    """
+    Extract IPv4 addresses with a hand-written linear-time scanner.
+
     Parameters:
-    email (str): The email address to validate
-    
+    text (str): The text to search for IP addresses
+    valid_only (bool): Only return addresses with every octet in 0-255
+    packed (bool): Return valid addresses as an array of unsigned 32-bit
+                   integers instead of strings (implies valid_only)
+
     Returns:
-    bool: True if the email is valid, False otherwise
-    
+    list or array.array: The same matches as extract_ip_addresses()
+
     Example:
-    >>> validate_email("user@example.com")
-    True
-    >>> validate_email("invalid-email")
-    False
-    
-    Notes:
-    - Should validate the format matches username@domain.tld
-    - Should handle special characters in the username
-    - Should handle various domain formats
+    >>> scan_ip_addresses("Server: 192.168.1.1, Bad: 999.1.1.1")
+    ['192.168.1.1', '999.1.1.1']
+    >>> list(scan_ip_addresses("Server: 192.168.1.1", packed=True))
+    [3232235777]
+    """
+    if not isinstance(text, str):
+        raise TypeError("Input text must be a string")
+    if packed:
+        return array(_UINT32, _packed_ipv4(octets for _, _, octets in _scan_ipv4(text)))
+    if valid_only:
+        return [
+            text[start:end]
+            for start, end, octets in _scan_ipv4(text)
+            if _octets_in_range(octets)
+        ]
+    return [text[start:end] for start, end, _ in _scan_ipv4(text)]
+
+def _validate_ipv4_without_regex(ip):
+    """The scanner engine's equivalent of the anchored validation pattern."""
+    # "$" also matches just before a single trailing newline
+    if ip.endswith("\n"):
+        ip = ip[:-1]
+    octets = ip.split(".")
+    return (
+        len(octets) == 4
+        and all(1 <= len(octet) <= 3 and octet.isdecimal() for octet in octets)
+        and _octets_in_range(octets)
+    )
+
+# Characters of the username part of EMAIL_PATTERN, for str.rstrip
+_EMAIL_USERNAME_CHARS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._%+-"
+_EMAIL_DOMAIN_RUN = r'[a-zA-Z0-9.-]*'
+_EMAIL_TLD_RUN = r'[a-zA-Z]*'
+# EMAIL_PATTERN, only starting where a run of username characters starts
+_EMAIL_AT_RUN_START = rf'(?<![a-zA-Z0-9._%+-]){EMAIL_PATTERN}'
+# Texts with fewer "@" signs than one per this many characters are scanned
+# by walking from "@" to "@"; denser texts by a run-anchored regex walk,
+# which has less per-match overhead
+EMAIL_AT_DENSITY = 128
+
+def _walk_at_signs(text, pos):
     """
-    # TODO: Implement this function
-    # 1. Validate input is a string (raise TypeError if not)
-    # 2. Create a raw string regex pattern to validate email
-    #    Hint: Like extract_emails but use ^ and $ to match entire string
-    #          ^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$
-    # 3. Use re.match() and return a boolean result
-    pass
+    Yield EMAIL_PATTERN spans by expanding around each "@" found with str.find.
 
-def validate_phone_number(phone):
+    "@" is not a username character, so a match's username is the run of
+    username characters that ends at its "@" (cut off at pos or the end of
+    the previous match). Every domain character is also a username
+    character, so the domain is the longest part of the domain-character
+    run after "@" that ends in a dot and two or more letters, exactly what
+    the backtracking pattern settles on. Each character is looked at a
+    bounded number of times.
     """
-    Validate if a string is a properly formatted US phone number.
-    
+    domain_run = _compiled(_EMAIL_DOMAIN_RUN).match
+    tld_run = _compiled(_EMAIL_TLD_RUN).match
+    floor = pos
+    at = text.find("@", pos)
+    while at != -1:
+        username = text[floor:at]
+        start = at - (len(username) - len(username.rstrip(_EMAIL_USERNAME_CHARS)))
+        floor = at + 1
+        if start < at:
+            end = domain_run(text, at + 1).end()
+            dot = text.rfind(".", at + 2, end - 2)
+            while dot != -1 and not text[dot + 1:dot + 3].isalpha():
+                dot = text.rfind(".", at + 2, dot)
+            if dot != -1:
+                end = tld_run(text, dot + 1).end()
+                yield start, end
+                floor = end
+                at = text.find("@", end)
+                continue
+        at = text.find("@", at + 1)
+
+def _walk_username_runs(text, pos):
+    """
+    Yield EMAIL_PATTERN spans, trying starts only where a username run starts.
+
+    All starts inside one run of username characters share the same "@"
+    and domain, so they succeed or fail together and only the first one
+    (the run start, or pos) needs trying. That keeps the regex from
+    re-scanning the run from every position.
+    """
+    match_at = PATTERNS["email"].match
+    search = _compiled(_EMAIL_AT_RUN_START).search
+    while True:
+        match = match_at(text, pos) or search(text, pos)
+        if match is None:
+            return
+        yield match.span()
+        pos = match.end()
+
+def _scan_emails(text, pos=0):
+    """
+    Yield the (start, end) spans PATTERNS["email"].finditer(text, pos)
+    would, in linear time.
+
+    The backtracking pattern retries every start position of a long run of
+    username characters (base64 blobs, dotted identifiers), which is
+    quadratic in the run length.
+    """
+    if text.count("@", pos) * EMAIL_AT_DENSITY < len(text) - pos:
+        return _walk_at_signs(text, pos)
+    return _walk_username_runs(text, pos)
+
+def scan_emails(text):
+    """
+    Extract email addresses in linear time.
+
     Parameters:
-    phone (str): The phone number to validate
-    
+    text (str): The text to search for email addresses
+
     Returns:
-    bool: True if the phone number is valid, False otherwise
-    
+    list: The same matches as EMAIL_PATTERN's findall(), in order
+
     Example:
-    >>> validate_phone_number("(123) 456-7890")
-    True
-    >>> validate_phone_number("555-1234")
-    False
-    
-    Notes:
-    - Should validate various formats: (123) 456-7890, 123-456-7890, etc.
-    - Must contain area code and 7 additional digits
-    - Separators can be dashes, dots, spaces, or none
+    >>> scan_emails("Contact us at support@example.com")
+    ['support@example.com']
     """
-    # TODO: Implement this function
-    # 1. Validate input is a string (raise TypeError if not)
-    # 2. Create a raw string regex pattern to validate phone numbers
-    #    Hint: Like extract_phones but use ^ and $ to match entire string
-    #          ^\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}$
-    # 3. Use re.match() and return a boolean result
-    pass
+    if not isinstance(text, str):
+        raise TypeError("Input text must be a string")
+    if not _prefilter("email", text):
+        return []
+    return [text[start:end] for start, end in _scan_emails(text)]
+
+# Digit-run scanning for the numeric patterns. Each entry is the literal
+# every match contains once digits are mapped to "0" (the "dddd" of a
+# phone number, the "/dddd" year of a US date, the "dddd-" year of an ISO
+# date), how far before that literal a match can start, and the characters
+# besides digits that can occur in or right around a match.
+_DIGIT_RUN_ANCHORS = {
+    "phone": ("0000", 10),
+    "us_date": ("/0000", 5),
+    "iso_date": ("0000-", 0),
+}
+# Windows start at least this many characters past an anchor, doubling
+# (up to the maximum) while anchors keep turning up within the window, so
+# dense numeric text is scanned in few long regex calls
+DIGIT_RUN_WINDOW = 256
+MAX_DIGIT_RUN_WINDOW = 64 * 1024
 
-def validate_ip_address(ip):
+def _can_cut(name, char):
+    """Return True if no match of a numeric pattern can contain or touch char."""
+    if name == "phone":
+        return not (char.isspace() or char in "()-.")
+    # Dates have word boundaries at both ends, so a window may only end on
+    # a non-word character
+    return not (_is_word(char) or char == ("/" if name == "us_date" else "-"))
+
+class _ShapeTable(dict):
     """
-    Validate if a string is a properly formatted IPv4 address.
-    
+    str.translate() table that maps every decimal digit to "0" and every
+    ASCII character no match can contain or touch to "\x00".
+
+    Non-ASCII characters are classified as they turn up rather than all
+    up front, so the first non-ASCII text costs only its distinct
+    characters. Those other than digits map to themselves, which only
+    makes windows longer.
+    """
+
+    def __init__(self, name):
+        super().__init__()
+        for code in range(128):
+            char = chr(code)
+            self[code] = "0" if char.isdecimal() else "\x00" if _can_cut(name, char) else char
+
+    def __missing__(self, code):
+        char = chr(code)
+        # setdefault keeps the table consistent if two threads race here
+        return self.setdefault(code, "0" if char.isdecimal() else char)
+
+@lru_cache(maxsize=None)
+def _shape_table(name):
+    """Return the _ShapeTable of the numeric registry pattern name."""
+    return _ShapeTable(name)
+
+def _digit_run_windows(name, text, pos=0):
+    """
+    Yield disjoint (start, end) windows that hold every match of a numeric
+    registry pattern from pos on.
+
+    The text is tokenized once with str.translate() into a shape string of
+    digit runs, separators and cut points, and str.find() jumps from anchor
+    to anchor over it, so numeric text that cannot hold a match (runs of
+    short digit groups, slash-free numbers) never reaches the regex. Each
+    window ends on a cut character, which no match can cross and which a
+    word boundary sees the same way as the end of the window. Every
+    character is examined by str.find() at most twice and by the regex at
+    most once, so the scan is linear in the length of the text.
+    """
+    anchor, lead = _DIGIT_RUN_ANCHORS[name]
+    shape = text.translate(_shape_table(name))
+    find = shape.find
+    length = len(text)
+    window = DIGIT_RUN_WINDOW
+    hit = find(anchor, pos)
+    while hit != -1:
+        start = max(pos, hit - lead)
+        pos = find("\x00", hit + window)
+        if pos == -1:
+            pos = length
+        yield start, pos
+        hit = find(anchor, pos)
+        if hit - pos < window:
+            window = min(window * 2, MAX_DIGIT_RUN_WINDOW)
+        else:
+            window = DIGIT_RUN_WINDOW
+
+def _scan_digit_runs(name, text, pattern=None):
+    """
+    Return what PATTERNS[pattern or name].findall(text) would, running the
+    regex only over the windows of _digit_run_windows().
+
+    pattern names a variant with capture groups that matches the same text.
+    """
+    findall = PATTERNS[pattern or name].findall
+    matches = []
+    for start, end in _digit_run_windows(name, text):
+        matches += findall(text, start, end)
+    return matches
+
+def scan_phone_numbers(text):
+    """
+    Extract phone numbers, running the regex only near long enough digit runs.
+
     Parameters:
-    ip (str): The IP address to validate
-    
+    text (str): The text to search for phone numbers
+
     Returns:
-    bool: True if the IP address is valid, False otherwise
-    
+    list: The same matches as PHONE_PATTERN's findall(), in order
+
     Example:
-    >>> validate_ip_address("192.168.1.1")
-    True
-    >>> validate_ip_address("256.0.0.1")
-    False
-    
-    Notes:
-    - Should validate format follows N.N.N.N where N is 1-3 digits
-    - Must verify each octet is in range 0-255
-    - Should handle values like 0.0.0.0 and 255.255.255.255
+    >>> scan_phone_numbers("Call 555-123-4567, ref 12 34 56 78 90")
+    ['555-123-4567']
     """
-    # TODO: Implement this function
-    # 1. Validate input is a string (raise TypeError if not)
-    # 2. Create a raw string regex pattern to validate IP format
-    #    Hint: Use capture groups to extract each octet: ^(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})$
-    # 3. Use re.match() to check the format
-    # 4. If format matches, verify each octet is in range 0-255
-    # 5. Return True only if format is valid AND all octets are in valid range
-    pass
+    if not isinstance(text, str):
+        raise TypeError("Input text must be a string")
+    if not _prefilter("phone", text):
+        return []
+    return _scan_digit_runs("phone", text)
 
-def replace_pattern(text, pattern, replacement):
+def scan_dates(text, format="MM/DD/YYYY"):
     """
-    Replace all occurrences of a pattern in text with replacement string.
-    
+    Extract dates, running the regex only near a four-digit year.
+
     Parameters:
-    text (str): The original text
-    pattern (str): The regex pattern to search for
-    replacement (str): The replacement string
-    
+    text (str): The text to search for dates
+    format (str): The expected date format (MM/DD/YYYY or YYYY-MM-DD)
+
     Returns:
-    str: Text with all pattern matches replaced
-    
+    list: The same matches as the format's pattern, in order
+
     Example:
-    >>> replace_pattern("My SSN is 123-45-6789", r'\d{3}-\d{2}-\d{4}', "XXX-XX-XXXX")
-    'My SSN is XXX-XX-XXXX'
-    
-    Notes:
-    - Should replace ALL occurrences, not just the first one
-    - All inputs must be strings
+    >>> scan_dates("Build 1/2/3/4 shipped 01/15/2023")
+    ['01/15/2023']
     """
-    # TODO: Implement this function
-    # 1. Validate all inputs are strings (raise TypeError if not)
-    # 2. Use re.sub() to replace all occurrences of the pattern
-    # 3. Return the modified text
-    pass
+    if not isinstance(text, str):
+        raise TypeError("Input text must be a string")
+    if format not in DATE_PATTERNS:
+        raise ValueError(f"Unsupported date format: {format}")
+    name = DATE_PATTERNS[format]
+    if not _prefilter(name, text):
+        return []
+    return _scan_digit_runs(name, text)
 
-def main():
+class MatchSpans:
     """
-    Main function to demonstrate the functionality of the Text Pattern Matcher.
+    Match positions stored as a flat array of offsets, sliced out lazily.
+
+    Only the (start, end) pairs are kept, in one array.array of 64-bit
+    integers; the text of a match is sliced out of the original string only
+    when it is accessed.
+
+    Example:
+    >>> spans = extract_emails_spans("Mail a@b.com or c@d.org")
+    >>> spans.span(1)
+    (16, 23)
+    >>> spans[1]
+    'c@d.org'
     """
-    print("===== TEXT PATTERN MATCHER =====")
-    
-    # Sample text with various patterns to detect
-    sample_text = """
-    Contact Information:
-    - Email: john.doe@example.com
-    - Phone: (555) 123-4567
-    - Alt Phone: 555-987-6543
-    - IP Address: 192.168.1.1
-    
-    Important Dates:
-    - Start Date: 01/15/2023
-    - End Date: 12/31/2023
-    - Update Released: 2023-06-15
+
+    def __init__(self, text, offsets):
+        self.text = text
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) // 2
+
+    def _index(self, index):
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("match index out of range")
+        return 2 * index
+
+    def span(self, index):
+        """Return the (start, end) offsets of match index."""
+        position = self._index(index)
+        return self.offsets[position], self.offsets[position + 1]
+
+    def __getitem__(self, index):
+        start, end = self.span(index)
+        return self.text[start:end]
+
+    def __iter__(self):
+        offsets, text = self.offsets, self.text
+        for position in range(0, len(offsets), 2):
+            yield text[offsets[position]:offsets[position + 1]]
+
+    def spans(self):
+        """Yield the (start, end) offsets of every match, in order."""
+        offsets = self.offsets
+        for position in range(0, len(offsets), 2):
+            yield offsets[position], offsets[position + 1]
+
+    def __repr__(self):
+        return f"MatchSpans({list(self.spans())!r})"
+
+def _iter_spans(name, text, pos=0):
     """
-    
-    # TODO: Implement the following sections:
-    # 1. Email extraction and validation
-    # 2. Phone number extraction and validation
-    # 3. Date extraction (both MM/DD/YYYY and YYYY-MM-DD formats)
-    # 4. IP address extraction and validation
+    Yield (start, end) for every match of a registry pattern from pos.
+
+    Emails go through the linear-time scanner, phone numbers and dates
+    through finditer over the digit-run windows, and IPs through finditer.
+    """
+    if name == "email":
+        return _scan_emails(text, pos)
+    if name in _DIGIT_RUN_ANCHORS:
+        finditer = PATTERNS[name].finditer
+        return (
+            match.span()
+            for start, end in _digit_run_windows(name, text, pos)
+            for match in finditer(text, start, end)
+        )
+    return (match.span() for match in PATTERNS[name].finditer(text, pos))
+
+def _match_spans(name, text):
+    """Collect the spans of every match of a registry pattern."""
+    offsets = array("q")
+    if _prefilter(name, text):
+        offsets.extend(chain.from_iterable(_iter_spans(name, text)))
+    return MatchSpans(text, offsets)
+
+def extract_emails_spans(text):
+    """
+    Locate all email addresses in the given text.
+
+    Parameters:
+    text (str): The text to search for email addresses
+
+    Returns:
+    MatchSpans: Offsets of the matches extract_emails() would return
+    """
+    if not isinstance(text, str):
+        raise TypeError("Input text must be a string")
+    return _match_spans("email", text)
+
+def extract_phone_numbers_spans(text):
+    """
+    Locate all phone numbers in the given text.
+
+    Parameters:
+    text (str): The text to search for phone numbers
+
+    Returns:
+    MatchSpans: Offsets of the matches extract_phone_numbers() would return
+    """
+    if not isinstance(text, str):
+        raise TypeError("Input text must be a string")
+    return _match_spans("phone", text)
+
+def extract_dates_spans(text, format="MM/DD/YYYY"):
+    """
+    Locate all dates in the specified format in the given text.
+
+    Parameters:
+    text (str): The text to search for dates
+    format (str): The expected date format (MM/DD/YYYY or YYYY-MM-DD)
+
+    Returns:
+    MatchSpans: Offsets of the matches extract_dates() would return
+    """
+    if not isinstance(text, str):
+        raise TypeError("Input text must be a string")
+    if format not in DATE_PATTERNS:
+        raise ValueError(f"Unsupported date format: {format}")
+    return _match_spans(DATE_PATTERNS[format], text)
+
+def extract_ip_addresses_spans(text):
+    """
+    Locate all IPv4 addresses in the given text.
+
+    Parameters:
+    text (str): The text to search for IP addresses
+
+    Returns:
+    MatchSpans: Offsets of the matches extract_ip_addresses() would return
+    """
+    if not isinstance(text, str):
+        raise TypeError("Input text must be a string")
+    return _match_spans("ip", text)
+
+# (result key, registry name) of every type extract_all() returns
+_EXTRACT_ALL_TYPES = [
+    ("emails", "email"),
+    ("iso_dates", "iso_date"),
+    ("us_dates", "us_date"),
+    ("ip_addresses", "ip"),
+    ("phone_numbers", "phone"),
+]
+# Emails are found by the linear-time scanner; the numeric types share one
+# alternation, grouped behind a "(?=[(\d])" lookahead so the regex engine
+# can skip ahead with a character-set search instead of trying every
+# alternative at every position.
+_COMBINED_PATTERN = (
+    "(?=[(\\d])(?:"
+    + "|".join(f"(?P<{key}>{PATTERN_SOURCES[name]})" for key, name in _EXTRACT_ALL_TYPES[1:])
+    + ")"
+)
+_TYPE_PATTERNS = {
+    key: (name, MAX_MATCH_LENGTHS[name])
+    for key, name in _EXTRACT_ALL_TYPES[1:]
+}
+
+def _match_starting_in(pattern, max_length, text, pos, end):
+    """
+    Return the leftmost match of pattern starting in [pos, end), or None.
+
+    The pattern is searched with endpos just past the longest match that
+    could start before end, so the search never runs on through the rest
+    of the text and word boundaries still see the real next character.
+    """
+    found = pattern.search(text, pos, end + max_length + 1)
+    return found if found and found.start() < end else None
+
+def extract_all(text, backend=None):
+    """
+    Extract emails, phone numbers, dates and IP addresses in a single scan.
+
+    Parameters:
+    text (str): The text to search
+    backend (str): Regex backend for this call (default: the one chosen
+                   with set_regex_backend())
+
+    Returns:
+    dict: Lists of matches keyed by "emails", "phone_numbers", "us_dates",
+          "iso_dates" and "ip_addresses"
+
+    Example:
+    >>> extract_all("Mail a@b.com on 01/15/2023 from 10.0.0.1")["us_dates"]
+    ['01/15/2023']
+
+    Notes:
+    - Each list is identical to what the individual extractor returns
+      (extract_dates with "MM/DD/YYYY" and "YYYY-MM-DD" for the two date keys)
+    - Emails come from the linear-time scanner. The numeric types share
+      one scan with a combined alternation; positions inside a consumed
+      match are re-checked for the other types so overlapping matches (a
+      phone inside a longer digit run, say) are not lost
+    - Types whose prefilter rules them out are skipped, and the scan is
+      skipped entirely when every prefilter does
+    - Backends other than re run each type's pattern separately
+    """
+    if not isinstance(text, str):
+        raise TypeError("Input text must be a string")
+    backend = _get_backend(backend)
+    if not backend.native:
+        return {
+            key: backend.patterns[name].findall(text) if _prefilter(name, text) else []
+            for key, name in _EXTRACT_ALL_TYPES
+        }
+    results = {key: [] for key, _ in _EXTRACT_ALL_TYPES}
+    if _prefilter("email", text):
+        results["emails"] = [text[start:end] for start, end in _scan_emails(text)]
+    candidates = [
+        (key, PATTERNS[name], max_length)
+        for key, (name, max_length) in _TYPE_PATTERNS.items()
+        if _prefilter(name, text)
+    ]
+    if not candidates:
+        return results
+    resume = dict.fromkeys(_TYPE_PATTERNS, 0)
+    for match in _compiled(_COMBINED_PATTERN).finditer(text):
+        start, end = match.span()
+        for key, pattern, max_length in candidates:
+            if key == match.lastgroup and resume[key] <= start:
+                results[key].append(match.group())
+                resume[key] = end
+                continue
+            # No type can match between consumed spans, so only positions
+            # inside this span need to be checked for the other types.
+            pos = max(resume[key], start)
+            while pos < end:
+                found = _match_starting_in(pattern, max_length, text, pos, end)
+                if found is None:
+                    break
+                results[key].append(found.group())
+                pos = resume[key] = found.end()
+    return results
+
+# Default read size for the iter_* streaming extractors
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Overlap carried between chunks for emails, whose pattern is unbounded.
+# 320 is the longest address SMTP allows (64 local + "@" + 255 domain);
+# longer runs of address characters may be cut at a chunk boundary.
+MAX_EMAIL_LENGTH = 320
+
+def _read_chunks(source, chunk_size):
+    """Return an iterator of str chunks from a file object, an iterable of str, or a str."""
+    if not isinstance(chunk_size, int) or isinstance(chunk_size, bool):
+        raise TypeError("Chunk size must be an integer")
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be at least 1")
+    if isinstance(source, str):
+        return iter([source])
+    if hasattr(source, "read"):
+        return iter(lambda: source.read(chunk_size), "")
+    try:
+        return iter(source)
+    except TypeError:
+        raise TypeError("Source must be a string, a text file object or an iterable of strings") from None
+
+def _scan_chunk(name, buffer, pos, final):
+    """
+    Scan buffer from pos for a registry pattern, one step of a stream.
+
+    A match starting at position p only depends on the text up to
+    p + max_length + 1 (the extra character is what a trailing \\b looks
+    at), so unless this is the final step, matches are only returned once
+    that much text is in the buffer. Returns (matches, tail, pos), where
+    tail is the undecided text plus one character of left context and pos
+    is where scanning resumes in it.
+    """
+    spans = _iter_spans(name, buffer, pos)
+    if final:
+        return [buffer[start:end] for start, end in spans], "", 0
+    max_length = MAX_MATCH_LENGTHS[name] or MAX_EMAIL_LENGTH
+    limit = len(buffer) - max_length - 1
+    matches = []
+    for start, end in spans:
+        if start > limit:
+            break
+        matches.append(buffer[start:end])
+        pos = end
+    pos = max(pos, limit + 1)
+    keep = max(pos - 1, 0)
+    return matches, buffer[keep:], pos - keep
+
+def _iter_pattern(name, chunks):
+    """
+    Yield every match of a registry pattern over an iterator of chunks.
+
+    Undecided text is carried into the next chunk (see _scan_chunk()),
+    keeping memory bounded by the chunk size plus the pattern's maximum
+    match length.
+    """
+    buffer = ""
+    pos = 0
+    for chunk in chunks:
+        if not isinstance(chunk, str):
+            raise TypeError("Source must yield strings (open files in text mode)")
+        matches, buffer, pos = _scan_chunk(name, buffer + chunk, pos, False)
+        yield from matches
+    yield from _scan_chunk(name, buffer, pos, True)[0]
+
+def iter_emails(source, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Lazily extract email addresses from a stream.
+
+    Parameters:
+    source: A text file object, an iterable of str chunks, or a str
+    chunk_size (int): Characters to read per call to source.read()
+
+    Returns:
+    generator: Yields the same matches as extract_emails(), in order
+
+    Example:
+    >>> import io
+    >>> list(iter_emails(io.StringIO("a@b.com, c@d.org"), chunk_size=4))
+    ['a@b.com', 'c@d.org']
+
+    Notes:
+    - Memory use is bounded by chunk_size plus a small overlap
+    - Addresses longer than MAX_EMAIL_LENGTH may be cut at a chunk boundary
+    """
+    return _iter_pattern("email", _read_chunks(source, chunk_size))
+
+def iter_phone_numbers(source, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Lazily extract phone numbers from a stream.
+
+    Parameters:
+    source: A text file object, an iterable of str chunks, or a str
+    chunk_size (int): Characters to read per call to source.read()
+
+    Returns:
+    generator: Yields the same matches as extract_phone_numbers(), in order
+    """
+    return _iter_pattern("phone", _read_chunks(source, chunk_size))
+
+def iter_dates(source, format="MM/DD/YYYY", chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Lazily extract dates in the specified format from a stream.
+
+    Parameters:
+    source: A text file object, an iterable of str chunks, or a str
+    format (str): The expected date format (MM/DD/YYYY or YYYY-MM-DD)
+    chunk_size (int): Characters to read per call to source.read()
+
+    Returns:
+    generator: Yields the same matches as extract_dates(), in order
+    """
+    if format not in DATE_PATTERNS:
+        raise ValueError(f"Unsupported date format: {format}")
+    return _iter_pattern(DATE_PATTERNS[format], _read_chunks(source, chunk_size))
+
+def iter_ip_addresses(source, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Lazily extract IPv4 addresses from a stream.
+
+    Parameters:
+    source: A text file object, an iterable of str chunks, or a str
+    chunk_size (int): Characters to read per call to source.read()
+
+    Returns:
+    generator: Yields the same matches as extract_ip_addresses(), in order
+    """
+    return _iter_pattern("ip", _read_chunks(source, chunk_size))
+
+def _count_matches(name, text, valid_only=False):
+    """
+    Count the matches of a registry pattern as the scan produces them.
+
+    Matches are fed straight from the scanners (a digit-run window at a
+    time) or finditer into Counter.update(), so no list of every match is
+    built first.
+    """
+    if not isinstance(text, str):
+        raise TypeError("Input text must be a string")
+    counts = Counter()
+    if not _prefilter(name, text):
+        return counts
+    backend = _get_backend()
+    if valid_only:
+        counts.update(
+            match.group()
+            for match in backend.patterns["ip_octets"].finditer(text)
+            if _octets_in_range(match.groups())
+        )
+    elif not backend.native:
+        counts.update(match.group() for match in backend.patterns[name].finditer(text))
+    elif name == "email":
+        counts.update(map(text.__getitem__, starmap(slice, _scan_emails(text))))
+    elif name in _DIGIT_RUN_ANCHORS:
+        findall = PATTERNS[name].findall
+        for start, end in _digit_run_windows(name, text):
+            # Only one window's matches are ever held at once
+            counts.update(findall(text, start, end))
+    else:
+        counts.update(map(re.Match.group, PATTERNS[name].finditer(text)))
+    return counts
+
+def count_emails(text):
+    """
+    Count each distinct email address in the given text.
+
+    Parameters:
+    text (str): The text to search for email addresses
+
+    Returns:
+    Counter: Address -> number of occurrences, in first-seen order
+
+    Example:
+    >>> count_emails("a@x.com, b@x.com, a@x.com")
+    Counter({'a@x.com': 2, 'b@x.com': 1})
+
+    Notes:
+    - Matches are counted during the scan; unlike
+      Counter(extract_emails(text)), no list of every match is built
+    """
+    return _count_matches("email", text)
+
+def count_phone_numbers(text):
+    """Count each distinct phone number in text; see count_emails()."""
+    return _count_matches("phone", text)
+
+def count_dates(text, format="MM/DD/YYYY"):
+    """Count each distinct date in the given format in text; see count_emails()."""
+    if not isinstance(text, str):
+        raise TypeError("Input text must be a string")
+    if format not in DATE_PATTERNS:
+        raise ValueError(f"Unsupported date format: {format}")
+    return _count_matches(DATE_PATTERNS[format], text)
+
+def count_ip_addresses(text, valid_only=False):
+    """Count each distinct IPv4 address in text; see count_emails()."""
+    return _count_matches("ip", text, valid_only)
+
+def _hash64(value):
+    """Stable 64-bit hash of a string, identical across processes and hosts."""
+    if not isinstance(value, str):
+        raise TypeError("Values must be strings")
+    digest = _deferred("hashlib", "blake2b")(value.encode("utf-8", "surrogatepass"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+class CountMinSketch:
+    """
+    Approximate per-value counts in fixed memory.
+
+    estimate() never undercounts; it overcounts by at most
+    e * total / width with probability 1 - exp(-depth).
+
+    Parameters:
+    width (int): Counters per row
+    depth (int): Number of rows (independent hash functions)
+    """
+
+    def __init__(self, width=2048, depth=4):
+        for name, value in (("width", width), ("depth", depth)):
+            if not isinstance(value, int) or isinstance(value, bool):
+                raise TypeError(f"Argument '{name}' must be an integer")
+            if value < 1:
+                raise ValueError(f"Argument '{name}' must be at least 1")
+        self.width = width
+        self.depth = depth
+        self._rows = [array("q", bytes(8 * width)) for _ in range(depth)]
+
+    def _indexes(self, hashed):
+        # Kirsch-Mitzenmacher: depth indexes from two halves of one hash
+        index, step = hashed & 0xFFFFFFFF, (hashed >> 32) | 1
+        width = self.width
+        for row in self._rows:
+            yield row, index % width
+            index += step
+
+    def _add_hash(self, hashed, count):
+        for row, index in self._indexes(hashed):
+            row[index] += count
+
+    def add(self, value, count=1):
+        """Add count occurrences of value."""
+        self._add_hash(_hash64(value), count)
+
+    def estimate(self, value):
+        """Return an upper bound on the number of times value was added."""
+        return min(row[index] for row, index in self._indexes(_hash64(value)))
+
+    def merge(self, other):
+        """Add the counts of another sketch of the same shape into this one."""
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Can only merge sketches with the same width and depth")
+        for row, other_row in zip(self._rows, other._rows):
+            for index, count in enumerate(other_row):
+                if count:
+                    row[index] += count
+
+class HyperLogLog:
+    """
+    Approximate distinct count in 2 ** precision bytes.
+
+    The standard error of count() is about 1.04 / sqrt(2 ** precision),
+    0.8% at the default precision of 14.
+
+    Parameters:
+    precision (int): Register index bits, 4 to 16
+    """
+
+    def __init__(self, precision=14):
+        if not isinstance(precision, int) or isinstance(precision, bool):
+            raise TypeError("Argument 'precision' must be an integer")
+        if not 4 <= precision <= 16:
+            raise ValueError("Argument 'precision' must be between 4 and 16")
+        self.precision = precision
+        self._registers = bytearray(1 << precision)
+
+    def _add_hash(self, hashed):
+        bits = 64 - self.precision
+        index = hashed >> bits
+        rank = bits - (hashed & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def add(self, value):
+        """Record one occurrence of value."""
+        self._add_hash(_hash64(value))
+
+    def count(self):
+        """Return the estimated number of distinct values added."""
+        registers = self._registers
+        size = len(registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(size, 0.7213 / (1 + 1.079 / size))
+        estimate = alpha * size * size / sum(2.0 ** -rank for rank in registers)
+        zeros = registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = size * math.log(size / zeros)
+        return round(estimate)
+
+    def merge(self, other):
+        """Fold another sketch of the same precision into this one."""
+        if other.precision != self.precision:
+            raise ValueError("Can only merge sketches with the same precision")
+        self._registers = bytearray(map(max, self._registers, other._registers))
+
+class SpaceSaving:
+    """
+    Track the k most frequent values in O(k) memory.
+
+    Every value whose true count exceeds total / k is guaranteed to be
+    kept. Reported counts never undercount, and count - error never
+    overcounts.
+
+    Parameters:
+    k (int): Number of values to track
+    """
+
+    def __init__(self, k=100):
+        if not isinstance(k, int) or isinstance(k, bool):
+            raise TypeError("Argument 'k' must be an integer")
+        if k < 1:
+            raise ValueError("Argument 'k' must be at least 1")
+        self.k = k
+        self._counts = {}
+        self._errors = {}
+
+    def _floor(self):
+        """Count assumed for untracked values: the minimum once the summary is full."""
+        return min(self._counts.values()) if len(self._counts) >= self.k else 0
+
+    def _combine(self, counts, errors, floor):
+        own_counts, own_errors, own_floor = self._counts, self._errors, self._floor()
+        merged = {}
+        for value in chain(own_counts, counts):
+            if value not in merged:
+                merged[value] = (
+                    own_counts.get(value, own_floor) + counts.get(value, floor),
+                    own_errors.get(value, own_floor) + errors.get(value, floor),
+                )
+        kept = heapq.nlargest(self.k, merged.items(), key=lambda item: item[1][0])
+        self._counts = {value: count for value, (count, _) in kept}
+        self._errors = {value: error for value, (_, error) in kept}
+
+    def update_counts(self, counts):
+        """Add a mapping of value -> exact count, e.g. a Counter of one batch."""
+        if len(self._counts) + len(counts) <= self.k:
+            for value, count in counts.items():
+                self._counts[value] = self._counts.get(value, 0) + count
+                self._errors.setdefault(value, 0)
+            return
+        self._combine(counts, {}, 0)
+
+    def merge(self, other):
+        """Fold another summary into this one, keeping this summary's k."""
+        self._combine(other._counts, other._errors, other._floor())
+
+    def top(self, n=None):
+        """Return up to n (value, count, error) triples, most frequent first."""
+        ranked = sorted(self._counts.items(), key=lambda item: item[1], reverse=True)
+        return [(value, count, self._errors[value]) for value, count in ranked[:n]]
+
+# Matches aggregated exactly with a Counter before each StreamSummary
+# sketch update, so sketches are updated once per distinct value per batch
+SUMMARY_BATCH_SIZE = 4096
+
+class StreamSummary:
+    """
+    Bounded-memory frequency summary of an unbounded stream of matches.
+
+    Combines SpaceSaving (top values), HyperLogLog (distinct count) and
+    CountMinSketch (per-value estimates). Summaries with the same
+    parameters can be merged, e.g. to combine per-node daily summaries;
+    hashing is stable across processes so this works between hosts.
+
+    Parameters:
+    top_k (int): Values tracked for top()
+    precision (int): HyperLogLog precision
+    width (int): CountMinSketch width
+    depth (int): CountMinSketch depth
+
+    Example:
+    >>> summary = StreamSummary(top_k=2)
+    >>> summary.update(["a@x.com", "b@x.com", "a@x.com"])
+    >>> summary.top(1), summary.distinct(), summary.total
+    ([('a@x.com', 2, 0)], 2, 3)
+    """
+
+    def __init__(self, top_k=100, precision=14, width=2048, depth=4):
+        self.total = 0
+        self._top = SpaceSaving(top_k)
+        self._distinct = HyperLogLog(precision)
+        self._frequency = CountMinSketch(width, depth)
+
+    def update(self, values):
+        """Add every string in values."""
+        try:
+            values = iter(values)
+        except TypeError:
+            raise TypeError("Values must be an iterable of strings") from None
+        while True:
+            counts = Counter(islice(values, SUMMARY_BATCH_SIZE))
+            if not counts:
+                return
+            for value, count in counts.items():
+                hashed = _hash64(value)
+                self._distinct._add_hash(hashed)
+                self._frequency._add_hash(hashed, count)
+            self._top.update_counts(counts)
+            self.total += sum(counts.values())
+
+    def merge(self, other):
+        """Fold another StreamSummary with the same parameters into this one."""
+        if not isinstance(other, StreamSummary):
+            raise TypeError("Can only merge another StreamSummary")
+        self._distinct.merge(other._distinct)
+        self._frequency.merge(other._frequency)
+        self._top.merge(other._top)
+        self.total += other.total
+
+    def top(self, n=None):
+        """Return up to n (value, count, error) triples, most frequent first."""
+        return self._top.top(n)
+
+    def distinct(self):
+        """Return the estimated number of distinct values."""
+        return self._distinct.count()
+
+    def estimate(self, value):
+        """Return an upper bound on how often value occurred."""
+        return self._frequency.estimate(value)
+
+def summarize(source, kind, summary=None, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Summarize the matches of one pattern type in a stream.
+
+    Parameters:
+    source: A text file object, an iterable of str chunks, or a str
+    kind (str): An extract_all() result key ("emails", "phone_numbers",
+                "us_dates", "iso_dates" or "ip_addresses")
+    summary (StreamSummary): Summary to add to (default: a new one)
+    chunk_size (int): Characters to read per call to source.read()
+
+    Returns:
+    StreamSummary: The updated summary
+
+    Example:
+    >>> with open("mail.log") as handle:
+    ...     summary = summarize(handle, "emails")
+    >>> summary.top(10)
+    """
+    names = dict(_EXTRACT_ALL_TYPES)
+    if kind not in names:
+        raise ValueError(f"Unsupported kind: {kind}")
+    if summary is None:
+        summary = StreamSummary()
+    elif not isinstance(summary, StreamSummary):
+        raise TypeError("Argument 'summary' must be a StreamSummary")
+    summary.update(_iter_pattern(names[kind], _read_chunks(source, chunk_size)))
+    return summary
+
+# Bytes versions of the extraction patterns, compiled on first use by
+# MappedFile. In bytes mode \\d, \\s and \\b are ASCII-only.
+_BYTES_PATTERNS = {}
+
+def _get_bytes_pattern(kind):
+    """Return the compiled bytes pattern for an extract_all() result key."""
+    names = dict(_EXTRACT_ALL_TYPES)
+    if kind not in names:
+        raise ValueError(f"Unsupported pattern kind: {kind}")
+    if kind not in _BYTES_PATTERNS:
+        source = PATTERN_SOURCES[names[kind]]
+        _BYTES_PATTERNS[kind] = re.compile(source.encode("ascii"))
+    return _BYTES_PATTERNS[kind]
+
+class MappedFile:
+    """
+    Read-only memory map of a file for extraction without decoding.
+
+    The built-in patterns run as bytes patterns directly over the mapping,
+    and matches come back as offsets or memoryview slices, so the file is
+    never decoded to str or copied.
+
+    Parameters:
+    path (str or os.PathLike): The file to map
+
+    Example:
+    >>> with MappedFile("server.log") as mapped:
+    ...     for start, end in mapped.iter_spans("ip_addresses"):
+    ...         print(start, end)
+
+    Notes:
+    - kind is one of the extract_all() keys: "emails", "phone_numbers",
+      "us_dates", "iso_dates" or "ip_addresses"
+    - Matching is ASCII-only; non-ASCII digits and spaces are not matched
+    - Views from iter_views() must be released before the file is closed
+    """
+
+    def __init__(self, path):
+        if not isinstance(path, (str, os.PathLike)):
+            raise TypeError("Path must be a string or path-like object")
+        import mmap
+        self._file = open(path, "rb")
+        try:
+            if os.fstat(self._file.fileno()).st_size:
+                self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                # Empty files cannot be mapped
+                self._data = b""
+        except (OSError, ValueError):
+            self._file.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self._data)
+
+    def close(self):
+        """Unmap and close the file."""
+        if not isinstance(self._data, bytes):
+            self._data.close()
+        self._file.close()
+
+    def iter_spans(self, kind):
+        """Yield (start, end) byte offsets of every match of kind, in order."""
+        for match in _get_bytes_pattern(kind).finditer(self._data):
+            yield match.span()
+
+    def iter_views(self, kind):
+        """Yield a zero-copy memoryview slice for every match of kind."""
+        view = memoryview(self._data)
+        for start, end in self.iter_spans(kind):
+            yield view[start:end]
+
+def validate_email(email, backend=None):
+    """
+    Validate if a string is a properly formatted email address.
+    
+    Parameters:
+    email (str): The email address to validate
+    backend (str): Regex backend for this call (default: the one chosen
+                   with set_regex_backend())
+    
+    Returns:
+    bool: True if the email is valid, False otherwise
+    
+    Example:
+    >>> validate_email("user@example.com")
+    True
+    >>> validate_email("invalid-email")
+    False
+    
+    Notes:
+    - Should validate the format matches username@domain.tld
+    - Should handle special characters in the username
+    - Should handle various domain formats
+    """
+    if not isinstance(email, str):
+        raise TypeError("Email must be a string")
+    return _get_backend(backend).patterns["email_validation"].match(email) is not None
+
+def validate_phone_number(phone, backend=None):
+    """
+    Validate if a string is a properly formatted US phone number.
+    
+    Parameters:
+    phone (str): The phone number to validate
+    backend (str): Regex backend for this call (default: the one chosen
+                   with set_regex_backend())
+    
+    Returns:
+    bool: True if the phone number is valid, False otherwise
+    
+    Example:
+    >>> validate_phone_number("(123) 456-7890")
+    True
+    >>> validate_phone_number("555-1234")
+    False
+    
+    Notes:
+    - Should validate various formats: (123) 456-7890, 123-456-7890, etc.
+    - Must contain area code and 7 additional digits
+    - Separators can be dashes, dots, spaces, or none
+    """
+    if not isinstance(phone, str):
+        raise TypeError("Phone number must be a string")
+    return _get_backend(backend).patterns["phone_validation"].match(phone) is not None
+
+def normalize_phone_number(phone):
+    """
+    Return the E.164-style form of a phone number, or None if it is invalid.
+
+    Example:
+    >>> normalize_phone_number("(123) 456-7890")
+    '+11234567890'
+    """
+    if not isinstance(phone, str):
+        raise TypeError("Phone number must be a string")
+    # Accept what validate_phone_number() does, whose "$" also matches just
+    # before a single trailing newline
+    if phone.endswith("\n"):
+        phone = phone[:-1]
+    match = PATTERNS["phone_groups"].fullmatch(phone)
+    if match is None:
+        return None
+    return "+1" + "".join(match.groups())
+
+def normalize_date(date, format="MM/DD/YYYY"):
+    """
+    Return the ISO YYYY-MM-DD form of a date, or None if it is malformed
+    or not a real calendar date.
+
+    Example:
+    >>> normalize_date("1/5/2023")
+    '2023-01-05'
+    >>> normalize_date("2023-2-30", format="YYYY-MM-DD") is None
+    True
+    """
+    if not isinstance(date, str):
+        raise TypeError("Date must be a string")
+    if format not in DATE_PATTERNS:
+        raise ValueError(f"Unsupported date format: {format}")
+    name = DATE_PATTERNS[format]
+    match = PATTERNS[name + "_groups"].fullmatch(date)
+    if match is None:
+        return None
+    normalized = _normalized_dates(name, [match.groups()])
+    return normalized[0] if normalized else None
+
+def _octets_in_range(octets):
+    """Return True when every 1-3 digit octet string is at most 255."""
+    return all(int(octet) <= 255 for octet in octets)
+
+def validate_ip_address(ip, engine="regex", backend=None):
+    """
+    Validate if a string is a properly formatted IPv4 address.
+    
+    Parameters:
+    ip (str): The IP address to validate
+    engine (str): "regex" (default) or "scanner" to split and check the
+                  octets without running a pattern
+    backend (str): Regex backend for this call (default: the one chosen
+                   with set_regex_backend())
+    
+    Returns:
+    bool: True if the IP address is valid, False otherwise
+    
+    Example:
+    >>> validate_ip_address("192.168.1.1")
+    True
+    >>> validate_ip_address("256.0.0.1")
+    False
+    
+    Notes:
+    - Should validate format follows N.N.N.N where N is 1-3 digits
+    - Must verify each octet is in range 0-255
+    - Should handle values like 0.0.0.0 and 255.255.255.255
+    """
+    if not isinstance(ip, str):
+        raise TypeError("IP address must be a string")
+    _check_engine(engine)
+    if engine == "scanner":
+        return _validate_ipv4_without_regex(ip)
+    match = _get_backend(backend).patterns["ip_validation"].match(ip)
+    if not match:
+        return False
+    return _octets_in_range(match.groups())
+
+def _as_flags(flags, as_numpy):
+    """Return a bytearray of 0/1 flags, or a zero-copy NumPy bool view of it."""
+    if not as_numpy:
+        return flags
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("as_numpy=True requires NumPy to be installed") from None
+    return numpy.frombuffer(flags, dtype=numpy.bool_)
+
+def _validate_many(values, pattern, as_numpy):
+    """Match every value against an anchored pattern, type-checking via the match call."""
+    try:
+        values = iter(values)
+    except TypeError:
+        raise TypeError("Values must be an iterable of strings") from None
+    match = pattern.match
+    try:
+        flags = bytearray(match(value) is not None for value in values)
+    except TypeError:
+        raise TypeError("All values must be strings") from None
+    return _as_flags(flags, as_numpy)
+
+def validate_emails_many(values, as_numpy=False, backend=None):
+    """
+    Validate many email addresses at once.
+
+    Parameters:
+    values (iterable): Strings to validate
+    as_numpy (bool): Return a NumPy bool array instead of a bytearray
+    backend (str): Regex backend for this call (default: the one chosen
+                   with set_regex_backend())
+
+    Returns:
+    bytearray: 1 where validate_email() would return True, else 0
+
+    Example:
+    >>> list(validate_emails_many(["user@example.com", "invalid-email"]))
+    [1, 0]
+    """
+    return _validate_many(values, _get_backend(backend).patterns["email_validation"], as_numpy)
+
+def validate_phone_numbers_many(values, as_numpy=False, backend=None):
+    """
+    Validate many phone numbers at once.
+
+    Parameters:
+    values (iterable): Strings to validate
+    as_numpy (bool): Return a NumPy bool array instead of a bytearray
+    backend (str): Regex backend for this call (default: the one chosen
+                   with set_regex_backend())
+
+    Returns:
+    bytearray: 1 where validate_phone_number() would return True, else 0
+
+    Example:
+    >>> list(validate_phone_numbers_many(["(123) 456-7890", "555-1234"]))
+    [1, 0]
+    """
+    return _validate_many(values, _get_backend(backend).patterns["phone_validation"], as_numpy)
+
+def validate_ip_addresses_many(values, as_numpy=False, backend=None):
+    """
+    Validate many IPv4 addresses at once.
+
+    Parameters:
+    values (iterable): Strings to validate
+    as_numpy (bool): Return a NumPy bool array instead of a bytearray
+    backend (str): Regex backend for this call (default: the one chosen
+                   with set_regex_backend())
+
+    Returns:
+    bytearray: 1 where validate_ip_address() would return True, else 0
+
+    Example:
+    >>> list(validate_ip_addresses_many(["192.168.1.1", "256.0.0.1"]))
+    [1, 0]
+
+    Notes:
+    - The values are joined with newlines and checked in one scan by a
+      pattern that encodes the 0-255 octet range, replacing each valid line
+      with a marker, so no per-value Python code runs
+    - Falls back to validate_ip_address() per value when the joined buffer
+      is not ASCII or a value contains a newline or the marker character
+    """
+    try:
+        values = list(values)
+    except TypeError:
+        raise TypeError("Values must be an iterable of strings") from None
+    try:
+        joined = "\n".join(values)
+    except TypeError:
+        raise TypeError("All values must be strings") from None
+    backend = _get_backend(backend)
+    if not values:
+        flags = bytearray()
+    elif joined.isascii() and joined.count("\n") == len(values) - 1 and "\x01" not in joined:
+        lines = backend.patterns["ip_lines"].sub("\x01", joined).split("\n")
+        flags = bytearray(map("\x01".__eq__, lines))
+    else:
+        flags = bytearray(validate_ip_address(value, backend=backend.name) for value in values)
+    return _as_flags(flags, as_numpy)
+
+class PatternCache:
+    """
+    Bounded LRU cache of compiled user-supplied patterns.
+
+    Unlike the re module's internal cache, which is cleared wholesale once it
+    fills up, this evicts only the least recently used pattern, so a large
+    but stable rule set keeps its compiled patterns.
+
+    Parameters:
+    maxsize (int): Maximum number of compiled patterns to keep
+    compile (callable): Function that compiles a pattern (default: re.compile)
+
+    Example:
+    >>> cache = PatternCache(maxsize=2)
+    >>> cache.get(r'[0-9]+').findall("a1b22")
+    ['1', '22']
+    >>> cache.info()["misses"]
+    1
+    """
+
+    def __init__(self, maxsize=256, compile=re.compile):
+        self._compile = compile
+        self._patterns = OrderedDict()
+        self._lock = threading.Lock()
+        self.maxsize = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.resize(maxsize)
+
+    def get(self, pattern, check=None):
+        """
+        Return the compiled form of pattern, compiling it on a miss.
+
+        Precompiled re.Pattern objects are returned unchanged and do not
+        touch the cache. Raises the engine's error (re.error by default)
+        for invalid patterns, which are never cached.
+
+        check, if given, is called with the compiled pattern and may raise
+        to reject it. Its verdict is stored with the cached entry, so it
+        runs once per compiled pattern and a rejection is raised again on
+        later calls without repeating the check.
+        """
+        if isinstance(pattern, re.Pattern):
+            if check is not None:
+                check(pattern)
+            return pattern
+        with self._lock:
+            entry = self._patterns.get(pattern)
+            if entry is not None:
+                self._patterns.move_to_end(pattern)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if entry is None:
+            # [compiled pattern, check verdict]: None until checked, then
+            # True or the exception the check raised
+            entry = [self._compile(pattern), None]
+            with self._lock:
+                self._patterns[pattern] = entry
+                self._patterns.move_to_end(pattern)
+                self._evict()
+        compiled, verdict = entry
+        if check is not None:
+            if verdict is None:
+                try:
+                    check(compiled)
+                    verdict = True
+                except Exception as e:
+                    verdict = e
+                entry[1] = verdict
+            if verdict is not True:
+                raise verdict.with_traceback(None)
+        return compiled
+
+    def resize(self, maxsize):
+        """Change the maximum size, evicting old entries if it shrinks."""
+        if not isinstance(maxsize, int) or isinstance(maxsize, bool):
+            raise TypeError("Cache size must be an integer")
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1")
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self):
+        """Drop every cached pattern and reset the counters."""
+        with self._lock:
+            self._patterns.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        """Return the hit/miss/eviction counters and current size as a dict."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._patterns),
+                "maxsize": self.maxsize,
+            }
+
+    def _evict(self):
+        while len(self._patterns) > self.maxsize:
+            self._patterns.popitem(last=False)
+            self.evictions += 1
+
+# Cache used by replace_pattern(); resize it with PATTERN_CACHE.resize(n)
+PATTERN_CACHE = PatternCache()
+
+class UnsafePatternError(ValueError):
+    """Raised when a user-supplied pattern fails the backtracking screen."""
+
+class PatternTimeoutError(TimeoutError):
+    """Raised when a pattern operation overruns its time budget."""
+
+def _parse_quantifier(pattern, i):
+    """
+    Parse a quantifier starting at pattern[i].
+
+    Returns (end, min, max, possessive), with max None for unbounded, or
+    None if pattern[i] does not start a quantifier.
+    """
+    n = len(pattern)
+    if i >= n:
+        return None
+    char = pattern[i]
+    if char == "*":
+        end, low, high = i + 1, 0, None
+    elif char == "+":
+        end, low, high = i + 1, 1, None
+    elif char == "?":
+        end, low, high = i + 1, 0, 1
+    elif char == "{":
+        close = pattern.find("}", i)
+        if close < 0:
+            return None
+        low, comma, high = pattern[i + 1:close].partition(",")
+        if not (low.isdigit() or (comma and not low)) or not (high.isdigit() or not high):
+            return None
+        if not comma:
+            high = low
+        end, low, high = close + 1, int(low or 0), int(high) if high else None
+    else:
+        return None
+    possessive = end < n and pattern[end] == "+"
+    if end < n and pattern[end] in "?+":
+        end += 1
+    return end, low, high, possessive
+
+# A leading inline flag group that turns on verbose mode, e.g. (?ix)
+_INLINE_VERBOSE = r'\(\?[aiLmsux]*x'
+
+# Characters the screen tests character classes against: ASCII plus a
+# non-ASCII letter, digit, space and ideograph; non-ASCII characters that
+# appear in the pattern itself are added per pattern
+_SCREEN_ALPHABET = "".join(map(chr, range(128))) + "é٣ 中"
+
+# Flags that change which characters a single atom matches
+_ATOM_FLAGS = re.IGNORECASE | re.ASCII | re.DOTALL | re.UNICODE
+
+@lru_cache(maxsize=1024)
+def _atom_mask(token, flags, alphabet):
+    """Bitmask over alphabet of the characters the one-character regex token matches."""
+    try:
+        compiled = re.compile(token, flags & _ATOM_FLAGS)
+    except re.error:
+        return (1 << len(alphabet)) - 1
+    mask = 0
+    for bit, char in enumerate(alphabet):
+        if compiled.fullmatch(char):
+            mask |= 1 << bit
+    return mask
+
+class _ScreenNode:
+    """
+    A parsed pattern element and what the backtracking screen knows of it.
+
+    first: characters a match can start with; chars: characters it can
+    contain; tail: characters a variable-length end of the match can give
+    back to whatever follows; low/high: match length bounds (high None when
+    unbounded); ambiguous: some text can be split between its parts in more
+    than one way; unsafe: (repeat nodes) the repeat itself is ambiguous.
+    """
+
+    __slots__ = ("kind", "children", "span", "first", "chars", "tail", "nullable",
+                 "low", "high", "ambiguous", "unsafe", "count", "rigid")
+
+    def __init__(self, kind, span, children=(), first=0, chars=0, tail=0,
+                 nullable=False, low=0, high=0, ambiguous=False):
+        self.kind = kind
+        self.span = span
+        self.children = list(children)
+        self.first = first
+        self.chars = chars
+        self.tail = tail
+        self.nullable = nullable
+        self.low = low
+        self.high = high
+        self.ambiguous = ambiguous
+        self.unsafe = False
+        self.count = 0
+        self.rigid = False
+
+    @property
+    def variable(self):
+        return self.low != self.high
+
+    @property
+    def can_fail(self):
+        return self.kind in ("anchor", "backref") or not self.nullable
+
+def _screen_sequence(items, span):
+    if len(items) == 1:
+        return items[0]
+    first = tail = chars = 0
+    for item in items:
+        first |= item.first
+        if not item.nullable:
+            break
+    for item in reversed(items):
+        tail |= item.tail
+        if not item.nullable:
+            break
+    ambiguous = False
+    for i, item in enumerate(items):
+        chars |= item.chars
+        ambiguous |= item.ambiguous
+        if item.tail and not ambiguous:
+            # A variable-length end that can swallow the start of what
+            # follows splits the same text more than one way
+            follow = 0
+            for after in items[i + 1:]:
+                follow |= after.first
+                if not after.nullable:
+                    break
+            ambiguous = bool(item.tail & follow)
+    highs = [item.high for item in items]
+    return _ScreenNode(
+        "sequence", span, items, first, chars, tail,
+        nullable=all(item.nullable for item in items),
+        low=sum(item.low for item in items),
+        high=None if None in highs else sum(highs),
+        ambiguous=ambiguous,
+    )
+
+def _screen_alternation(branches, span):
+    if len(branches) == 1:
+        return branches[0]
+    node = _ScreenNode(
+        "alternation", span, branches,
+        nullable=any(branch.nullable for branch in branches),
+        low=min(branch.low for branch in branches),
+        high=None if any(branch.high is None for branch in branches)
+        else max(branch.high for branch in branches),
+        ambiguous=any(branch.ambiguous for branch in branches),
+    )
+    for i, branch in enumerate(branches):
+        node.first |= branch.first
+        node.chars |= branch.chars
+        node.tail |= branch.tail
+        for other in branches[:i]:
+            # Overlapping branches of different or varying length, like
+            # (a|aa), or single characters, like (\w|\d), can both match
+            if branch.first & other.first and (
+                branch.variable or other.variable or branch.low != other.low or branch.low == 1
+            ):
+                node.ambiguous = True
+    return node
+
+def _screen_repeat(child, low, high, possessive, span):
+    node = _ScreenNode(
+        "repeat", span, [child], child.first, child.chars,
+        nullable=low == 0 or child.nullable,
+        low=low * child.low,
+        high=None if high is None or child.high is None else high * child.high,
+    )
+    node.count = low
+    node.rigid = possessive
+    if not possessive:
+        node.tail = child.chars if node.variable else child.tail
+        # The star-height test, narrowed to repeats whose iterations can
+        # really be split differently: (a+)+ and (\w+\s?)* can, (\w+\.)+
+        # cannot because each iteration must end with the dot. Two
+        # iterations at most cost no worse than quadratic time.
+        node.unsafe = (high is None or high > 2) and (
+            child.ambiguous or (child.variable and bool(child.tail & child.first))
+        )
+        node.ambiguous = node.unsafe or child.ambiguous
+    return node
+
+class _ScreenParser:
+    """Parse a pattern string into _ScreenNodes for the backtracking screen."""
+
+    def __init__(self, pattern, flags):
+        self.pattern = pattern
+        self.flags = flags
+        self.verbose = bool(flags & re.VERBOSE)
+        extra = sorted({char for char in pattern if ord(char) > 127} - set(_SCREEN_ALPHABET))
+        self.alphabet = _SCREEN_ALPHABET + "".join(extra)
+        self.everything = (1 << len(self.alphabet)) - 1
+        self.i = 0
+
+    def parse(self):
+        node = self.alternation()
+        while self.i < len(self.pattern):
+            # A stray ")" in an invalid pattern: screen the rest as well
+            self.i += 1
+            node = _screen_sequence([node, self.alternation()], (0, self.i))
+        return node
+
+    def skip_verbose(self):
+        pattern, n = self.pattern, len(self.pattern)
+        while self.verbose and self.i < n:
+            if pattern[self.i].isspace():
+                self.i += 1
+            elif pattern[self.i] == "#":
+                newline = pattern.find("\n", self.i)
+                self.i = n if newline < 0 else newline + 1
+            else:
+                break
+
+    def alternation(self):
+        start = self.i
+        branches = [self.sequence()]
+        while self.i < len(self.pattern) and self.pattern[self.i] == "|":
+            self.i += 1
+            branches.append(self.sequence())
+        return _screen_alternation(branches, (start, self.i))
+
+    def sequence(self):
+        start, items = self.i, []
+        while True:
+            self.skip_verbose()
+            if self.i >= len(self.pattern) or self.pattern[self.i] in "|)":
+                break
+            atom_start = self.i
+            node = self.atom()
+            if node is None:
+                continue
+            self.skip_verbose()
+            quantifier = _parse_quantifier(self.pattern, self.i)
+            if quantifier is not None:
+                self.i, low, high, possessive = quantifier
+                node = _screen_repeat(node, low, high, possessive, (atom_start, self.i))
+            items.append(node)
+        if not items:
+            return _ScreenNode("sequence", (start, self.i), nullable=True)
+        return _screen_sequence(items, (start, self.i))
+
+    def character(self, token, start):
+        mask = _atom_mask(token, self.flags, self.alphabet)
+        return _ScreenNode("character", (start, self.i), first=mask, chars=mask, low=1, high=1)
+
+    def zero_width(self, start, kind="anchor", children=()):
+        return _ScreenNode(kind, (start, self.i), children, nullable=True)
+
+    def backreference(self, start):
+        everything = self.everything
+        return _ScreenNode("backref", (start, self.i), first=everything, chars=everything,
+                           tail=everything, nullable=True, high=None)
+
+    def atom(self):
+        pattern, start = self.pattern, self.i
+        char = pattern[start]
+        if char == "(":
+            return self.group()
+        if char == "[":
+            i, n = start + 1, len(pattern)
+            if i < n and pattern[i] == "^":
+                i += 1
+            if i < n and pattern[i] == "]":
+                i += 1
+            while i < n and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+            self.i = i + 1
+            return self.character(pattern[start:self.i], start)
+        if char in "^$":
+            self.i += 1
+            return self.zero_width(start)
+        if char != "\\":
+            self.i += 1
+            return self.character("." if char == "." else re.escape(char), start)
+        escape = pattern[start + 1:start + 2]
+        if escape in ("b", "B", "A", "Z"):
+            self.i += 2
+            return self.zero_width(start)
+        if escape[:1].isdigit() and escape != "0":
+            self.i += 2
+            while self.i < len(pattern) and pattern[self.i].isdigit() and self.i - start < 3:
+                self.i += 1
+            return self.backreference(start)
+        if escape == "N":
+            close = pattern.find("}", start)
+            self.i = len(pattern) if close < 0 else close + 1
+        else:
+            self.i = start + 2 + {"x": 2, "u": 4, "U": 8, "0": 2}.get(escape, 0)
+        return self.character(pattern[start:self.i], start)
+
+    def group(self):
+        pattern, start = self.pattern, self.i
+        kind, atomic = "group", False
+        if pattern.startswith("(?#", start):
+            close = pattern.find(")", start)
+            self.i = len(pattern) if close < 0 else close + 1
+            return None
+        if pattern.startswith("(?P=", start):
+            close = pattern.find(")", start)
+            self.i = len(pattern) if close < 0 else close + 1
+            return self.backreference(start)
+        if pattern.startswith("(?P<", start):
+            close = pattern.find(">", start)
+            self.i = len(pattern) if close < 0 else close + 1
+        elif pattern.startswith(("(?=", "(?!"), start):
+            kind, self.i = "anchor", start + 3
+        elif pattern.startswith(("(?<=", "(?<!"), start):
+            kind, self.i = "anchor", start + 4
+        elif pattern.startswith("(?>", start):
+            atomic, self.i = True, start + 3
+        elif pattern.startswith("(?(", start):
+            close = pattern.find(")", start + 3)
+            self.i = len(pattern) if close < 0 else close + 1
+        elif pattern.startswith("(?", start):
+            i = start + 2
+            while i < len(pattern) and pattern[i] in "aiLmsux-":
+                i += 1
+            self.i = i + 1
+            if pattern[i:i + 1] != ":":
+                # Global inline flags, already in self.flags
+                return None
+        else:
+            self.i = start + 1
+        child = self.alternation()
+        if self.i < len(pattern):
+            self.i += 1
+        if kind == "anchor":
+            return self.zero_width(start, kind, [child])
+        node = _ScreenNode(
+            "group", (start, self.i), [child], child.first, child.chars,
+            0 if atomic else child.tail, child.nullable, child.low, child.high,
+            ambiguous=child.ambiguous and not atomic,
+        )
+        node.rigid = atomic
+        return node
+
+def _first_unsafe_repeat(node, tail_can_fail):
+    """
+    Return the span of the first unsafe repeat in node, or None.
+
+    tail_can_fail tells whether something after node can fail to match:
+    only then does the engine backtrack into node and try its other splits.
+    """
+    if node.kind == "repeat":
+        if node.rigid:
+            tail_can_fail = False
+        else:
+            # Mandatory iterations after the first can fail as well
+            tail_can_fail = tail_can_fail or node.count > 1
+            if node.unsafe and tail_can_fail:
+                return node.span
+    elif node.kind == "sequence":
+        items = node.children
+        for i, item in enumerate(items):
+            rest_can_fail = tail_can_fail or any(after.can_fail for after in items[i + 1:])
+            span = _first_unsafe_repeat(item, rest_can_fail)
+            if span is not None:
+                return span
+        return None
+    elif node.kind == "anchor" or node.rigid:
+        tail_can_fail = False
+    for child in node.children:
+        span = _first_unsafe_repeat(child, tail_can_fail)
+        if span is not None:
+            return span
+    return None
+
+@lru_cache(maxsize=256)
+def _find_unsafe_repeat(pattern, flags):
+    """
+    Return (start, end) of the first repeat that can backtrack
+    catastrophically, or None.
+
+    A repeated group is unsafe when the same text can be divided between
+    its iterations (or between the parts of one iteration) in more than
+    one way, like (a+)+, (\\w+\\s?)* or (a|aa)*, and something after it can
+    fail to match, so the engine tries every division before giving up.
+    Atomic groups and possessive quantifiers cannot backtrack and are
+    exempt.
+    """
+    return _first_unsafe_repeat(_ScreenParser(pattern, flags).parse(), False)
+
+def check_pattern_safety(pattern):
+    """
+    Statically screen a regex pattern for catastrophic-backtracking risk.
+
+    Parameters:
+    pattern (str or re.Pattern): The pattern to screen
+
+    Raises:
+    UnsafePatternError: If a repeat can split the same text between its
+                        iterations in more than one way and something
+                        after it can fail (e.g. (a+)+$ or (a|aa)*c)
+
+    Example:
+    >>> check_pattern_safety(r'(\\w+\\.)+\\w+')
+    >>> check_pattern_safety(r'(a+)+$')
+    Traceback (most recent call last):
+    ...
+    UnsafePatternError: Ambiguous repeat '(a+)+' at position 0 can backtrack catastrophically
+
+    Notes:
+    - Repeats whose iterations are delimited, like (\\w+\\.)+ or
+      (?:\\s*,\\s*)+ at the end of a pattern, pass; a flagged pattern can be
+      rewritten with an atomic group or possessive quantifier
+      ((?>\\w+\\s?)*$, (\\w++\\s?)*$) or run with allow_unsafe=True
+    - The screen is a heuristic over character classes, not a proof: it
+      can miss slow patterns (such as ones built from backreferences) and
+      flag some safe ones, so untrusted patterns also need a timeout
+    """
+    if isinstance(pattern, re.Pattern):
+        # A compiled pattern's flags already include global inline flags
+        pattern, flags = pattern.pattern, pattern.flags
+    elif isinstance(pattern, str):
+        try:
+            # Picks up global inline flags such as (?x) and (?i)
+            flags = re.compile(pattern).flags
+        except re.error:
+            flags = re.VERBOSE if _compiled(_INLINE_VERBOSE).match(pattern) is not None else 0
+    if not isinstance(pattern, str):
+        raise TypeError("Pattern must be a string or compiled pattern")
+    span = _find_unsafe_repeat(pattern, flags)
+    if span is not None:
+        start, end = span
+        raise UnsafePatternError(
+            f"Ambiguous repeat '{pattern[start:end]}' at position {start} can backtrack catastrophically"
+        )
+
+def _sub_worker(connection, compiled, replacement, text):
+    try:
+        connection.send((True, compiled.sub(replacement, text)))
+    except Exception as e:
+        connection.send((False, e))
+    finally:
+        connection.close()
+
+def _sub_with_timeout(compiled, replacement, text, timeout):
+    """Run compiled.sub in a child process, killing it after timeout seconds."""
+    import multiprocessing
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(
+        target=_sub_worker, args=(sender, compiled, replacement, text), daemon=True
+    )
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(timeout):
+            raise PatternTimeoutError(
+                f"Pattern {compiled.pattern!r} exceeded its {timeout}s time budget"
+            )
+        ok, result = receiver.recv()
+    except EOFError:
+        raise RuntimeError("Replacement worker exited without a result") from None
+    finally:
+        receiver.close()
+        if process.is_alive():
+            process.kill()
+        process.join()
+    if not ok:
+        raise result
+    return result
+
+def replace_pattern(text, pattern, replacement, timeout=None, allow_unsafe=False, backend=None):
+    r"""
+    Replace all occurrences of a pattern in text with replacement string.
+    
+    Parameters:
+    text (str): The original text
+    pattern (str or re.Pattern): The regex pattern to search for
+    replacement (str): The replacement string
+    timeout (float): Time budget in seconds; when given, the replacement
+                     runs in a child process that is killed on overrun
+    allow_unsafe (bool): Skip the check_pattern_safety() screen
+    backend (str): Regex backend for this call (default: the one chosen
+                   with set_regex_backend())
+    
+    Returns:
+    str: Text with all pattern matches replaced
+    
+    Example:
+    >>> replace_pattern("My SSN is 123-45-6789", r'\d{3}-\d{2}-\d{4}', "XXX-XX-XXXX")
+    'My SSN is XXX-XX-XXXX'
+    
+    Notes:
+    - Should replace ALL occurrences, not just the first one
+    - All inputs must be strings (pattern may also be a precompiled re.Pattern)
+    - String patterns are compiled through PATTERN_CACHE (or the backend's
+      own PatternCache); precompiled re.Pattern objects always run on re
+    - Patterns that fail check_pattern_safety() raise UnsafePatternError (a
+      ValueError) unless allow_unsafe=True or the backend guarantees linear
+      time (re2); ordinary patterns such as (\w+\.)+\w+ pass
+    - The screen runs once per cached pattern: its verdict is kept with the
+      compiled pattern in the PatternCache
+    - The screen is a heuristic and there is no time limit by default:
+      only timeout= (or a linear-time backend) bounds the running time of
+      an untrusted pattern
+    - Overrunning the timeout raises PatternTimeoutError (a TimeoutError);
+      the child process costs a few milliseconds per call, so reserve
+      timeouts for untrusted patterns
+    """
+    for name, value in (("text", text), ("replacement", replacement)):
+        if not isinstance(value, str):
+            raise TypeError(f"Argument '{name}' must be a string")
+    if not isinstance(pattern, (str, re.Pattern)):
+        raise TypeError("Argument 'pattern' must be a string or compiled pattern")
+    if timeout is not None:
+        if not isinstance(timeout, (int, float)) or isinstance(timeout, bool):
+            raise TypeError("Argument 'timeout' must be a number")
+        if timeout <= 0:
+            raise ValueError("Argument 'timeout' must be positive")
+    backend = _get_backend(backend)
+    native = backend.native or isinstance(pattern, re.Pattern)
+    if allow_unsafe or backend.linear and not native:
+        screen = None
+    else:
+        # Screens the compiled re.Pattern, whose flags include any inline
+        # ones; other engines' flags do not match re's, so they get the source
+        screen = lambda compiled: check_pattern_safety(compiled if native else pattern)
+    try:
+        compiled = backend.compile(pattern, screen)
+        if timeout is None:
+            return compiled.sub(replacement, text)
+        return _sub_with_timeout(compiled, replacement, text, timeout)
+    except (re.error, backend.module.error) as e:
+        raise ValueError(f"Invalid regex pattern: {e}") from e
+
+# Global inline flags, such as (?i), at the start of a pattern
+_GLOBAL_FLAGS = r'(?:\(\?[aiLmsux]+\))*'
+
+# Letters of the flags a scoped (?flags:...) group can set
+_SCOPED_FLAGS = ((re.ASCII, "a"), (re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"), (re.VERBOSE, "x"))
+
+# Three-digit octal escapes, escapes and character classes, which are
+# copied as they are; numbered backreferences; capturing group openers;
+# and the group name or number in (?P<name>...), (?P=name) and (?(1)...)
+_GROUP_TOKEN = r'(?s)\\[0-7]{3}|\\([1-9][0-9]?)|\\.|\[\^?\]?(?:\\.|[^\]\\])*\]|(\((?!\?))|(\(\?P[<=]|\(\?\()(\w+)'
+
+def _rename_groups(pattern, prefix):
+    """
+    Return pattern with every capturing group named prefix plus its name or
+    number, and every backreference and conditional rewritten to match.
+    """
+    names = [None]
+    def rename(match):
+        number, opener, reference, name = match.groups()
+        if number is not None:
+            return f"(?P={names[int(number)]})"
+        if opener is not None:
+            names.append(f"{prefix}{len(names)}")
+            return f"(?P<{names[-1]}>"
+        if reference is None:
+            return match.group()
+        if name.isdigit():
+            return reference + names[int(name)]
+        if reference == "(?P<":
+            names.append(prefix + name)
+        return reference + prefix + name
+    return _compiled(_GROUP_TOKEN).sub(rename, pattern)
+
+def _scoped_rule(pattern, flags, prefix):
+    """
+    Return pattern as a self-contained alternative for a combined pattern:
+    leading global flags become a scoped (?flags:...) group and every
+    group is renamed with _rename_groups().
+    """
+    body = _rename_groups(pattern[_compiled(_GLOBAL_FLAGS).match(pattern).end():], prefix)
+    letters = "".join(letter for flag, letter in _SCOPED_FLAGS if flags & flag)
+    if not letters:
+        return body
+    # A verbose pattern can end in a comment, which would swallow the ")"
+    return f"(?{letters}:{body}\n)" if flags & re.VERBOSE else f"(?{letters}:{body})"
+
+class Redactor:
+    """
+    Apply many replacement rules to a text in a single pass.
+
+    The rule patterns are compiled into one alternation with a capturing
+    group per rule, and one re.sub call dispatches each match to its rule's
+    replacement, so the text is scanned and copied once however many rules
+    there are.
+
+    Parameters:
+    rules (iterable): (name, pattern, replacement) string triples
+    allow_unsafe (bool): Skip the check_pattern_safety() screen of each rule
+
+    Example:
+    >>> redactor = Redactor([
+    ...     ("email", EMAIL_PATTERN, "[EMAIL]"),
+    ...     ("ssn", r'\\d{3}-\\d{2}-\\d{4}', "XXX-XX-XXXX"),
+    ... ])
+    >>> redactor.redact("Mail a@b.com, SSN 123-45-6789")
+    'Mail [EMAIL], SSN XXX-XX-XXXX'
+    >>> redactor.hits
+    {'email': 1, 'ssn': 1}
+
+    Notes:
+    - At any position the first listed rule that matches wins, so results
+      equal applying replace_pattern() rule by rule only when no two rules
+      match overlapping text
+    - Replacements may use group references (\\1, \\g<name>) relative to
+      their own rule's pattern
+    - Rules may reuse the same group names and use numbered backreferences
+      and conditionals: each rule's groups are renamed apart in the
+      combined pattern, and its replacement is expanded against its own
+      pattern, so \\1 and \\g<name> keep referring to its own groups
+    - Global inline flags such as (?i) at the start of a rule apply to
+      that rule only
+    """
+
+    def __init__(self, rules, allow_unsafe=False):
+        try:
+            rules = list(rules)
+        except TypeError:
+            raise TypeError("Rules must be an iterable of (name, pattern, replacement) triples") from None
+        if not rules:
+            raise ValueError("At least one rule is required")
+        self.hits = {}
+        self._rules = []
+        self._group_rules = {}
+        alternatives = []
+        group = 1
+        for rule in rules:
+            if not isinstance(rule, tuple) or len(rule) != 3:
+                raise TypeError("Each rule must be a (name, pattern, replacement) triple")
+            name, pattern, replacement = rule
+            for label, value in (("name", name), ("pattern", pattern), ("replacement", replacement)):
+                if not isinstance(value, str):
+                    raise TypeError(f"Rule {label} must be a string")
+            if name in self.hits:
+                raise ValueError(f"Duplicate rule name: {name}")
+            try:
+                compiled = re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"Invalid regex pattern for rule '{name}': {e}") from e
+            if not allow_unsafe:
+                try:
+                    check_pattern_safety(compiled)
+                except UnsafePatternError as e:
+                    raise UnsafePatternError(f"Rule '{name}': {e}") from None
+            # Templates need the rule's own match object to expand group references
+            template = "\\" in replacement
+            self._group_rules[group] = len(self._rules)
+            self._rules.append((name, compiled, replacement, template))
+            self.hits[name] = 0
+            alternatives.append(f"({_scoped_rule(pattern, compiled.flags, f'_rule{len(self._rules)}_')})")
+            group += compiled.groups + 1
+        try:
+            self.pattern = re.compile("|".join(alternatives))
+        except re.error as e:
+            raise ValueError(f"Rules cannot be combined: {e}") from e
+
+    def redact(self, text):
+        """
+        Return text with every rule applied in one pass.
+
+        Parameters:
+        text (str): The original text
+
+        Returns:
+        str: The redacted text; per-rule match counts accumulate in hits
+        """
+        if not isinstance(text, str):
+            raise TypeError("Input text must be a string")
+        counts = [0] * len(self._rules)
+        rules, group_rules = self._rules, self._group_rules
+
+        def replace(match):
+            index = group_rules[match.lastindex]
+            counts[index] += 1
+            _, compiled, replacement, template = rules[index]
+            if template:
+                return compiled.match(match.string, match.start()).expand(replacement)
+            return replacement
+
+        result = self.pattern.sub(replace, text)
+        for (name, _, _, _), count in zip(rules, counts):
+            self.hits[name] += count
+        return result
+
+    def reset_hits(self):
+        """Reset every per-rule hit count to zero."""
+        for name in self.hits:
+            self.hits[name] = 0
+
+# Documents sent to a worker process per task by analyze_corpus()
+CORPUS_BATCH_SIZE = 64
+
+def analyze_document(document):
+    """
+    Run the extractors and IP validation over a single document.
+
+    Parameters:
+    document (str or os.PathLike): Document text, or the path of a UTF-8
+                                   text file to read
+
+    Returns:
+    dict: The extract_all() result plus "valid_ip_addresses", the
+          extracted IPs that pass validate_ip_address()
+
+    Example:
+    >>> analyze_document("Ping 10.0.0.1 and 999.1.1.1")["valid_ip_addresses"]
+    ['10.0.0.1']
+    """
+    if isinstance(document, os.PathLike):
+        with open(document, encoding="utf-8", errors="replace") as handle:
+            document = handle.read()
+    if not isinstance(document, str):
+        raise TypeError("Document must be a string or path-like object")
+    results = extract_all(document)
+    results["valid_ip_addresses"] = [
+        ip for ip in results["ip_addresses"] if _octets_in_range(ip.split("."))
+    ]
+    return results
+
+def _analyze_batch(batch):
+    return [analyze_document(document) for document in batch]
+
+def _batched(documents, batch_size):
+    while True:
+        batch = list(islice(documents, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def analyze_corpus(documents, workers=None, batch_size=CORPUS_BATCH_SIZE):
+    """
+    Analyze many documents across a pool of worker processes.
+
+    Parameters:
+    documents (iterable): Document texts (str) and/or file paths
+                          (os.PathLike, e.g. pathlib.Path)
+    workers (int): Number of worker processes (default: CPU count)
+    batch_size (int): Documents handed to a worker per task
+
+    Returns:
+    generator: Yields one analyze_document() result per document, in input order
+
+    Example:
+    >>> results = analyze_corpus(pathlib.Path("mail").glob("*.eml"), workers=32)
+    >>> sum(len(r["emails"]) for r in results)
+
+    Notes:
+    - Plain strings are always treated as document text, never as paths
+    - At most 2 * workers batches are in flight, so memory stays bounded
+      for unbounded inputs
+    - Inputs that fit in a single batch, or workers=1, run in-process
+    - Each worker compiles a built-in pattern the first time one of its
+      documents needs it, then reuses it for the rest of the corpus
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    for name, value in (("workers", workers), ("batch_size", batch_size)):
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise TypeError(f"Argument '{name}' must be an integer")
+        if value < 1:
+            raise ValueError(f"Argument '{name}' must be at least 1")
+    try:
+        documents = iter(documents)
+    except TypeError:
+        raise TypeError("Documents must be an iterable") from None
+    return _analyze_corpus(_batched(documents, batch_size), workers)
+
+def _analyze_corpus(batches, workers):
+    first = next(batches, None)
+    second = next(batches, None) if first is not None else None
+    if second is None or workers == 1:
+        for batch in chain(filter(None, [first, second]), batches):
+            yield from _analyze_batch(batch)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = deque()
+        for batch in chain([first, second], batches):
+            pending.append(executor.submit(_analyze_batch, batch))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (id INTEGER PRIMARY KEY, key UNIQUE NOT NULL);
+CREATE TABLE IF NOT EXISTS entities (
+    id INTEGER PRIMARY KEY, kind TEXT NOT NULL, value TEXT NOT NULL, UNIQUE (kind, value)
+);
+CREATE TABLE IF NOT EXISTS postings (
+    entity INTEGER NOT NULL, document INTEGER NOT NULL, PRIMARY KEY (entity, document)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_by_document ON postings (document);
+"""
+
+class EntityIndex:
+    """
+    Persistent inverted index from extracted entities to the documents
+    that mention them.
+
+    Each document is analyzed once with analyze_document(), and every
+    distinct email, phone number, date and IP address in it is recorded in
+    a SQLite database. Postings are clustered by (entity, document id), so
+    a lookup is a single index range scan that returns documents in the
+    order they were added.
+
+    Parameters:
+    path (str or os.PathLike): The database file, created if missing
+
+    Example:
+    >>> with EntityIndex("mail.idx") as index:
+    ...     index.add_many((path.name, path) for path in pathlib.Path("mail").glob("*.eml"))
+    ...     index.lookup("emails", "admin@test.org")
+    ['0001.eml', '0042.eml']
+
+    Notes:
+    - kind is one of the extract_all() keys: "emails", "phone_numbers",
+      "us_dates", "iso_dates" or "ip_addresses"
+    - Document keys are strings or integers chosen by the caller; adding
+      a key again replaces that document's entities
+    - Values are looked up exactly as the extractors return them
+    """
+
+    def __init__(self, path):
+        if not isinstance(path, (str, os.PathLike)):
+            raise TypeError("Path must be a string or path-like object")
+        import sqlite3
+        self._connection = sqlite3.connect(path)
+        try:
+            self._connection.execute("PRAGMA journal_mode = WAL")
+            self._connection.execute("PRAGMA synchronous = NORMAL")
+            self._connection.executescript(_INDEX_SCHEMA)
+        except sqlite3.Error:
+            self._connection.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self._connection.execute("SELECT count(*) FROM documents").fetchone()[0]
+
+    def __contains__(self, key):
+        return self._connection.execute("SELECT 1 FROM documents WHERE key = ?", (key,)).fetchone() is not None
+
+    def close(self):
+        """Close the database."""
+        self._connection.close()
+
+    def _store(self, key, results):
+        """Record one analyze_document() result under key (inside a transaction)."""
+        if not isinstance(key, (str, int)) or isinstance(key, bool):
+            raise TypeError("Document key must be a string or an integer")
+        execute = self._connection.execute
+        row = execute("SELECT id FROM documents WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            document = execute("INSERT INTO documents (key) VALUES (?)", (key,)).lastrowid
+        else:
+            document = row[0]
+            execute("DELETE FROM postings WHERE document = ?", (document,))
+        entities = [
+            (kind, value)
+            for kind, _ in _EXTRACT_ALL_TYPES
+            for value in dict.fromkeys(results[kind])
+        ]
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO entities (kind, value) VALUES (?, ?)", entities
+        )
+        self._connection.executemany(
+            "INSERT INTO postings SELECT id, ? FROM entities WHERE kind = ? AND value = ?",
+            [(document, kind, value) for kind, value in entities],
+        )
+
+    def add(self, key, document):
+        """
+        Index one document.
+
+        Parameters:
+        key (str or int): The caller's name for the document
+        document (str or os.PathLike): Document text, or the path of a file
+                                       to read it from
+        """
+        results = analyze_document(document)
+        with self._connection:
+            self._store(key, results)
+
+    def add_many(self, items, workers=None, batch_size=CORPUS_BATCH_SIZE):
+        """
+        Index many documents in one transaction, analyzing them with analyze_corpus().
+
+        Parameters:
+        items (iterable): (key, document) pairs, as for add()
+        workers (int): Number of worker processes (default: CPU count)
+        batch_size (int): Documents handed to a worker per task
+
+        Returns:
+        int: The number of documents indexed
+        """
+        keys = deque()
+
+        def documents():
+            for key, document in items:
+                keys.append(key)
+                yield document
+
+        count = 0
+        with self._connection:
+            for results in analyze_corpus(documents(), workers, batch_size):
+                self._store(keys.popleft(), results)
+                count += 1
+        return count
+
+    def lookup(self, kind, value):
+        """
+        Return the keys of every document that mentions value, in the order
+        the documents were first added.
+
+        Parameters:
+        kind (str): An extract_all() key
+        value (str): The entity, as the extractors return it
+
+        Returns:
+        list: Document keys
+        """
+        if kind not in dict(_EXTRACT_ALL_TYPES):
+            raise ValueError(f"Unsupported pattern kind: {kind}")
+        if not isinstance(value, str):
+            raise TypeError("Value must be a string")
+        rows = self._connection.execute(
+            "SELECT documents.key FROM entities"
+            " JOIN postings ON postings.entity = entities.id"
+            " JOIN documents ON documents.id = postings.document"
+            " WHERE entities.kind = ? AND entities.value = ?"
+            " ORDER BY postings.document",
+            (kind, value),
+        )
+        return [key for key, in rows]
+
+# Bump when the cache key or the stored result format changes, to
+# invalidate every ResultCache
+RESULT_CACHE_FORMAT = 2
+# Bump when a hand-written scanner (emails, digit runs, IPv4) changes what
+# it returns; part of pattern_set_version()
+SCANNER_VERSION = 1
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Functions ResultCache.run() accepts: they take the document text first
+# and return lists, dicts or strings
+_CACHEABLE_FUNCTIONS = frozenset({
+    "extract_emails", "extract_phone_numbers", "extract_dates", "extract_ip_addresses",
+    "extract_all", "analyze_document", "replace_pattern",
+    "scan_emails", "scan_phone_numbers", "scan_dates", "scan_ip_addresses",
+})
+
+_RESULT_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS results (
+    content BLOB NOT NULL, call TEXT NOT NULL, value TEXT NOT NULL,
+    size INTEGER NOT NULL, used INTEGER NOT NULL, UNIQUE (content, call)
+);
+CREATE INDEX IF NOT EXISTS results_by_use ON results (used);
+"""
+
+def pattern_set_version():
+    """
+    Return a digest of everything that decides what the extractors return.
+
+    That is PATTERN_SOURCES, the helper patterns and match length bounds
+    of the scanners and extract_all(), the ASCII part of the digit-run
+    shape tables, SCANNER_VERSION and RESULT_CACHE_FORMAT.
+
+    Returns:
+    str: 32 hex digits that change whenever any of them does
+    """
+    import json
+    source = json.dumps([
+        RESULT_CACHE_FORMAT,
+        SCANNER_VERSION,
+        PATTERN_SOURCES,
+        [_EMAIL_USERNAME_CHARS, _EMAIL_DOMAIN_RUN, _EMAIL_TLD_RUN, _EMAIL_AT_RUN_START, _COMBINED_PATTERN],
+        MAX_MATCH_LENGTHS,
+        _DIGIT_RUN_ANCHORS,
+        {name: "".join(_shape_table(name)[code] for code in range(128)) for name in _DIGIT_RUN_ANCHORS},
+    ], sort_keys=True)
+    return _deferred("hashlib", "blake2b")(source.encode("utf-8"), digest_size=16).hexdigest()
+
+def _cache_argument(value):
+    """JSON encoder fallback that lets compiled patterns be part of a cache key."""
+    if isinstance(value, re.Pattern):
+        return ["re.Pattern", value.pattern, value.flags]
+    raise TypeError("Arguments must be JSON-serializable to be cached")
+
+class ResultCache:
+    """
+    On-disk cache of per-document results, keyed by a content hash.
+
+    run() hashes the document with BLAKE2b and returns the stored result
+    of the same call on the same content when there is one, so unchanged
+    documents cost only their hashing. Results live in a SQLite database
+    and the least recently used ones are evicted once they take more than
+    max_bytes.
+
+    Parameters:
+    path (str or os.PathLike): The database file, created if missing
+    max_bytes (int): Upper bound on the size of the stored results
+
+    Example:
+    >>> with ResultCache("results.db") as cache:
+    ...     cache.run(extract_emails, pathlib.Path("mail/0001.eml"))
+    ['admin@test.org']
+
+    Notes:
+    - The cache records pattern_set_version() and drops every result when
+      it opens with a different version, so editing a built-in pattern
+      invalidates it automatically
+    - Results are keyed by the regex backend they ran on (the backend=
+      argument, or get_regex_backend() when there is none), so switching
+      backends never serves results computed under another one
+    - Only functions that return lists, dicts or strings can be cached
+      (not integer output); results come back as JSON round-trips them
+    - One process at a time should write to a cache file
+    """
+
+    def __init__(self, path, max_bytes=RESULT_CACHE_MAX_BYTES):
+        if not isinstance(path, (str, os.PathLike)):
+            raise TypeError("Path must be a string or path-like object")
+        if not isinstance(max_bytes, int) or isinstance(max_bytes, bool):
+            raise TypeError("Cache size must be an integer")
+        if max_bytes < 1:
+            raise ValueError("Cache size must be at least 1")
+        import sqlite3
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        try:
+            self._connection.execute("PRAGMA journal_mode = WAL")
+            self._connection.execute("PRAGMA synchronous = NORMAL")
+            with self._connection:
+                self._connection.executescript(_RESULT_CACHE_SCHEMA)
+                version = pattern_set_version()
+                row = self._connection.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+                if row is None or row[0] != version:
+                    self._connection.execute("DELETE FROM results")
+                    self._connection.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (version,))
+            self._size, self._clock = self._connection.execute(
+                "SELECT coalesce(sum(size), 0), coalesce(max(used), 0) FROM results"
+            ).fetchone()
+            with self._connection:
+                self._evict()
+        except sqlite3.Error:
+            self._connection.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the database."""
+        self._connection.close()
+
+    def run(self, func, document, *args, **kwargs):
+        """
+        Return func(text, *args, **kwargs), from the cache when possible.
+
+        Parameters:
+        func: One of the extractors, analyze_document() or replace_pattern()
+        document (str or os.PathLike): Document text, or the path of a UTF-8
+                                       text file to read it from
+
+        Returns:
+        The function's result
+        """
+        import json
+        name = getattr(func, "__name__", None)
+        if name not in _CACHEABLE_FUNCTIONS:
+            raise ValueError(f"Function cannot be cached: {name}")
+        if isinstance(document, os.PathLike):
+            with open(document, encoding="utf-8", errors="replace") as handle:
+                document = handle.read()
+        if not isinstance(document, str):
+            raise TypeError("Document must be a string or path-like object")
+        # The regex backend can change the result, so the resolved one is
+        # part of the key even when the call does not pass backend=
+        kwargs_key = dict(kwargs)
+        backend = kwargs_key.pop("backend", None) or get_regex_backend()
+        call = json.dumps([name, backend, args, kwargs_key], sort_keys=True, default=_cache_argument)
+        content = _deferred("hashlib", "blake2b")(
+            document.encode("utf-8", "surrogatepass"), digest_size=16
+        ).digest()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT rowid, value FROM results WHERE content = ? AND call = ?", (content, call)
+            ).fetchone()
+            if row is not None:
+                self.hits += 1
+                self._clock += 1
+                with self._connection:
+                    self._connection.execute("UPDATE results SET used = ? WHERE rowid = ?", (self._clock, row[0]))
+                return json.loads(row[1])
+            self.misses += 1
+        result = func(document, *args, **kwargs)
+        if not isinstance(result, (list, dict, str)):
+            raise TypeError(f"Only list, dict and str results can be cached, not {type(result).__name__}")
+        value = json.dumps(result)
+        size = len(value) + len(call) + len(content)
+        with self._lock:
+            if size <= self.max_bytes:
+                self._clock += 1
+                with self._connection:
+                    replaced = self._connection.execute(
+                        "SELECT size FROM results WHERE content = ? AND call = ?", (content, call)
+                    ).fetchone()
+                    self._connection.execute(
+                        "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                        (content, call, value, size, self._clock),
+                    )
+                    self._size += size - (replaced[0] if replaced else 0)
+                    self._evict()
+        return result
+
+    def _evict(self):
+        """Drop least recently used results until they fit in max_bytes."""
+        while self._size > self.max_bytes:
+            rows = self._connection.execute(
+                "SELECT rowid, size FROM results ORDER BY used LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._size = 0
+                return
+            for rowid, size in rows:
+                if self._size <= self.max_bytes:
+                    break
+                self._connection.execute("DELETE FROM results WHERE rowid = ?", (rowid,))
+                self._size -= size
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every cached result and reset the counters."""
+        with self._lock:
+            with self._connection:
+                self._connection.execute("DELETE FROM results")
+            self._size = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        """Return the hit/miss/eviction counters and current size as a dict."""
+        with self._lock:
+            entries = self._connection.execute("SELECT count(*) FROM results").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+# Calls coalesced into one executor task by AsyncAnalyzer, and the text
+# size (in characters of str arguments) at which a batch is sent early
+ASYNC_BATCH_SIZE = 64
+ASYNC_BATCH_CHARS = 256 * 1024
+# Calls admitted per event loop before analyze() and friends start waiting
+ASYNC_MAX_PENDING = 1024
+
+def _run_calls(calls):
+    """Run a batch of (func, args) calls, capturing each call's exception."""
+    results = []
+    for func, args in calls:
+        try:
+            results.append((True, func(*args)))
+        except Exception as e:
+            results.append((False, e))
+    return results
+
+class AsyncAnalyzer:
+    """
+    Run analyzer functions from asyncio code on a shared, bounded executor.
+
+    Calls made during one event loop iteration are coalesced into batches
+    of up to batch_size calls (or batch_chars characters of text), each
+    handed to the executor as a single task, so small documents do not pay
+    a process hand-off each. At most max_pending calls per event loop are
+    queued or running; further callers wait, which applies backpressure to
+    producers.
+
+    Parameters:
+    max_workers (int): Worker processes (default: CPU count)
+    executor (concurrent.futures.Executor): Use this executor instead of
+                                            a private process pool; it is
+                                            not shut down by close()
+    batch_size (int): Maximum calls per executor task
+    batch_chars (int): Text size at which a batch is sent early
+    max_pending (int): Maximum queued or running calls per event loop
+
+    Example:
+    >>> async with AsyncAnalyzer(max_workers=4) as analyzer:
+    ...     results = await asyncio.gather(*(analyze(m, analyzer) for m in messages))
+    """
+
+    def __init__(self, max_workers=None, executor=None, batch_size=ASYNC_BATCH_SIZE,
+                 batch_chars=ASYNC_BATCH_CHARS, max_pending=ASYNC_MAX_PENDING):
+        for name, value in (("max_workers", max_workers), ("batch_size", batch_size),
+                            ("batch_chars", batch_chars), ("max_pending", max_pending)):
+            if name == "max_workers" and value is None:
+                continue
+            if not isinstance(value, int) or isinstance(value, bool):
+                raise TypeError(f"Argument '{name}' must be an integer")
+            if value < 1:
+                raise ValueError(f"Argument '{name}' must be at least 1")
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batch_chars = batch_chars
+        self.max_pending = max_pending
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._lock = threading.Lock()
+        # Per event loop: asyncio primitives cannot be shared between loops
+        self._loops = weakref.WeakKeyDictionary()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                from concurrent.futures import ProcessPoolExecutor
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def _loop_state(self, loop):
+        state = self._loops.get(loop)
+        if state is None:
+            import asyncio
+            state = self._loops[loop] = {
+                "semaphore": asyncio.Semaphore(self.max_pending),
+                "batch": [],
+                "chars": 0,
+                "scheduled": False,
+            }
+        return state
+
+    async def run(self, func, *args):
+        """
+        Run func(*args) on the executor and return its result.
+
+        func and args must be picklable when the executor is a process
+        pool. Exceptions raised by func are re-raised here.
+        """
+        import asyncio
+        loop = asyncio.get_running_loop()
+        state = self._loop_state(loop)
+        async with state["semaphore"]:
+            future = loop.create_future()
+            state["batch"].append((func, args, future))
+            state["chars"] += sum(len(arg) for arg in args if isinstance(arg, str))
+            if len(state["batch"]) >= self.batch_size or state["chars"] >= self.batch_chars:
+                self._flush(loop, state)
+            elif not state["scheduled"]:
+                state["scheduled"] = True
+                loop.call_soon(self._flush, loop, state)
+            return await future
+
+    def _flush(self, loop, state):
+        import asyncio
+        state["scheduled"] = False
+        batch, state["batch"], state["chars"] = state["batch"], [], 0
+        if not batch:
+            return
+        try:
+            task = self._get_executor().submit(_run_calls, [(func, args) for func, args, _ in batch])
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        asyncio.wrap_future(task, loop=loop).add_done_callback(partial(self._deliver, batch))
+
+    @staticmethod
+    def _deliver(batch, task):
+        if task.cancelled():
+            for _, _, future in batch:
+                future.cancel()
+            return
+        error = task.exception()
+        results = [(False, error)] * len(batch) if error is not None else task.result()
+        for (_, _, future), (ok, value) in zip(batch, results):
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def close(self):
+        """Shut down the private process pool, if one was started."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None and self._owns_executor:
+            executor.shutdown(cancel_futures=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+_ASYNC_ANALYZER = None
+_ASYNC_ANALYZER_LOCK = threading.Lock()
+
+def get_async_analyzer():
+    """Return the shared AsyncAnalyzer used when no analyzer is passed."""
+    global _ASYNC_ANALYZER
+    with _ASYNC_ANALYZER_LOCK:
+        if _ASYNC_ANALYZER is None:
+            _ASYNC_ANALYZER = AsyncAnalyzer()
+        return _ASYNC_ANALYZER
+
+def _async_analyzer(analyzer):
+    if analyzer is None:
+        return get_async_analyzer()
+    if not isinstance(analyzer, AsyncAnalyzer):
+        raise TypeError("Argument 'analyzer' must be an AsyncAnalyzer")
+    return analyzer
+
+async def analyze(document, analyzer=None):
+    """
+    Asynchronously run analyze_document() on the shared executor.
+
+    Parameters:
+    document (str or os.PathLike): Document text or path
+    analyzer (AsyncAnalyzer): Analyzer to use (default: get_async_analyzer())
+
+    Returns:
+    dict: The analyze_document() result
+
+    Example:
+    >>> (await analyze("Ping 10.0.0.1"))["valid_ip_addresses"]
+    ['10.0.0.1']
+    """
+    if not isinstance(document, (str, os.PathLike)):
+        raise TypeError("Document must be a string or path-like object")
+    return await _async_analyzer(analyzer).run(analyze_document, document)
+
+async def areplace_pattern(text, pattern, replacement, allow_unsafe=False, analyzer=None):
+    """
+    Asynchronously run replace_pattern() on the shared executor.
+
+    Takes the same arguments as replace_pattern() except timeout: process
+    pool workers cannot start the child process a timeout needs. Use
+    asyncio.wait_for() to stop waiting instead.
+    """
+    return await _async_analyzer(analyzer).run(replace_pattern, text, pattern, replacement,
+                                               None, allow_unsafe)
+
+async def _aread_chunks(source, chunk_size):
+    """Yield str chunks from an async or sync text/binary source."""
+    if isinstance(source, str):
+        yield source
+        return
+    import inspect
+    decoder = codecs.getincrementaldecoder("utf-8")("replace")
+    if hasattr(source, "read"):
+        while True:
+            chunk = source.read(chunk_size)
+            if inspect.isawaitable(chunk):
+                chunk = await chunk
+            if not chunk:
+                break
+            yield decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+    elif hasattr(source, "__aiter__"):
+        async for chunk in source:
+            yield decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+    else:
+        for chunk in _read_chunks(source, chunk_size):
+            yield chunk
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+def _aiter_pattern(name, source, chunk_size, analyzer):
+    """Validate arguments eagerly, then return the async scan generator."""
+    if not isinstance(chunk_size, int) or isinstance(chunk_size, bool):
+        raise TypeError("Chunk size must be an integer")
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be at least 1")
+    return _aiter_scan(name, source, chunk_size, _async_analyzer(analyzer))
+
+async def _aiter_scan(name, source, chunk_size, analyzer):
+    """Async counterpart of _iter_pattern(); each scan step runs on the executor."""
+    buffer = ""
+    pos = 0
+    async for chunk in _aread_chunks(source, chunk_size):
+        if not isinstance(chunk, str):
+            raise TypeError("Source must yield strings or bytes")
+        buffer += chunk
+        # Short reads are accumulated so each executor hand-off scans a full chunk
+        if len(buffer) - pos < chunk_size:
+            continue
+        matches, buffer, pos = await analyzer.run(_scan_chunk, name, buffer, pos, False)
+        for match in matches:
+            yield match
+    matches, _, _ = await analyzer.run(_scan_chunk, name, buffer, pos, True)
+    for match in matches:
+        yield match
+
+def aiter_emails(source, chunk_size=STREAM_CHUNK_SIZE, analyzer=None):
+    """
+    Asynchronously extract email addresses from a stream.
+
+    Parameters:
+    source: An asyncio.StreamReader or other object with a (possibly async)
+            read(n) method, an async iterable of str or UTF-8 bytes chunks,
+            or anything iter_emails() accepts
+    chunk_size (int): Characters scanned per executor hand-off
+    analyzer (AsyncAnalyzer): Analyzer to use (default: get_async_analyzer())
+
+    Returns:
+    async generator: Yields the same matches as extract_emails(), in order
+
+    Example:
+    >>> async for email in aiter_emails(reader):
+    ...     print(email)
+    """
+    return _aiter_pattern("email", source, chunk_size, analyzer)
+
+def aiter_phone_numbers(source, chunk_size=STREAM_CHUNK_SIZE, analyzer=None):
+    """Asynchronously extract phone numbers from a stream; see aiter_emails()."""
+    return _aiter_pattern("phone", source, chunk_size, analyzer)
+
+def aiter_dates(source, format="MM/DD/YYYY", chunk_size=STREAM_CHUNK_SIZE, analyzer=None):
+    """Asynchronously extract dates in the given format from a stream; see aiter_emails()."""
+    if format not in DATE_PATTERNS:
+        raise ValueError(f"Unsupported date format: {format}")
+    return _aiter_pattern(DATE_PATTERNS[format], source, chunk_size, analyzer)
+
+def aiter_ip_addresses(source, chunk_size=STREAM_CHUNK_SIZE, analyzer=None):
+    """Asynchronously extract IPv4 addresses from a stream; see aiter_emails()."""
+    return _aiter_pattern("ip", source, chunk_size, analyzer)
+
+# Upper bounds, in seconds, of the latency histogram buckets recorded by the
+# instrumentation layer; a final +Inf bucket catches the rest
+LATENCY_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+# Distinct replace_pattern() patterns given their own metrics label; any
+# further patterns are recorded as "other" to bound memory and label count
+MAX_PATTERN_LABELS = 64
+
+def _argument(args, kwargs, index, keyword, default=None):
+    """Return a call argument given positionally or by keyword."""
+    if len(args) > index:
+        return args[index]
+    return kwargs.get(keyword, default)
+
+def _replace_pattern_label(args, kwargs):
+    pattern = _argument(args, kwargs, 1, "pattern")
+    if isinstance(pattern, re.Pattern):
+        pattern = pattern.pattern
+    if not isinstance(pattern, str):
+        return "other"
+    if pattern in _METRICS["replace_pattern"] or len(_METRICS["replace_pattern"]) < MAX_PATTERN_LABELS:
+        return pattern
+    return "other"
+
+# Instrumented functions and how to find the pattern label of a call
+_INSTRUMENTED = {
+    "extract_emails": lambda args, kwargs: "email",
+    "extract_phone_numbers": lambda args, kwargs: "phone",
+    "extract_dates": lambda args, kwargs: DATE_PATTERNS.get(_argument(args, kwargs, 1, "format", "MM/DD/YYYY"), "other"),
+    "extract_ip_addresses": lambda args, kwargs: "ip",
+    "validate_email": lambda args, kwargs: "email",
+    "validate_phone_number": lambda args, kwargs: "phone",
+    "validate_ip_address": lambda args, kwargs: "ip",
+    "replace_pattern": _replace_pattern_label,
+}
+
+# function -> pattern label -> counters; see metrics()
+_METRICS = {name: {} for name in _INSTRUMENTED}
+_METRICS_LOCK = threading.Lock()
+# Uninstrumented originals while instrumentation is enabled
+_ORIGINAL_FUNCTIONS = {}
+
+def _record(name, label, args, result, elapsed, failed):
+    value = args[0] if args else None
+    if isinstance(result, bool):
+        matches = int(result)
+    elif result is None or isinstance(result, str):
+        matches = 0
+    else:
+        matches = len(result)
+    bucket = bisect_left(LATENCY_BUCKETS, elapsed)
+    with _METRICS_LOCK:
+        stats = _METRICS[name].get(label)
+        if stats is None:
+            stats = _METRICS[name][label] = {
+                "calls": 0,
+                "errors": 0,
+                "input_chars": 0,
+                "matches": 0,
+                "latency_sum": 0.0,
+                "latency_buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+            }
+        stats["calls"] += 1
+        stats["errors"] += failed
+        stats["input_chars"] += len(value) if isinstance(value, str) else 0
+        stats["matches"] += matches
+        stats["latency_sum"] += elapsed
+        stats["latency_buckets"][bucket] += 1
+
+def _instrument(name, func, label_of):
+    @wraps(func)
+    def instrumented(*args, **kwargs):
+        start = perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            _record(name, label_of(args, kwargs), args, None, perf_counter() - start, True)
+            raise
+        _record(name, label_of(args, kwargs), args, result, perf_counter() - start, False)
+        return result
+    return instrumented
+
+def enable_instrumentation():
+    """
+    Start recording per-function, per-pattern metrics.
+
+    The public extractors, validators and replace_pattern() are replaced
+    by recording wrappers in this module's namespace, so there is no
+    overhead at all while instrumentation is disabled.
+
+    Notes:
+    - Only calls made through the module (analyzer.extract_emails(...)),
+      including calls between its own functions, are recorded; names
+      bound by "from ... import" before enabling keep the originals
+    - Metrics are per process; worker processes record their own
+    """
+    module = globals()
+    with _METRICS_LOCK:
+        if _ORIGINAL_FUNCTIONS:
+            return
+        for name, label_of in _INSTRUMENTED.items():
+            _ORIGINAL_FUNCTIONS[name] = module[name]
+            module[name] = _instrument(name, module[name], label_of)
+
+def disable_instrumentation():
+    """Restore the uninstrumented functions; recorded metrics are kept."""
+    module = globals()
+    with _METRICS_LOCK:
+        module.update(_ORIGINAL_FUNCTIONS)
+        _ORIGINAL_FUNCTIONS.clear()
+
+def instrumentation_enabled():
+    """Return True while enable_instrumentation() is in effect."""
+    return bool(_ORIGINAL_FUNCTIONS)
+
+def metrics():
+    """
+    Return a snapshot of the recorded metrics.
+
+    Returns:
+    dict: {function: {pattern: stats}}, where stats has "calls", "errors",
+          "input_chars", "matches" (list length for extractors, 1 per True
+          for validators, 0 for replace_pattern()), "latency_sum" in
+          seconds and "latency_buckets", the non-cumulative counts per
+          LATENCY_BUCKETS bound plus a final +Inf count
+
+    Example:
+    >>> enable_instrumentation()
+    >>> extract_emails("a@b.com")
+    ['a@b.com']
+    >>> metrics()["extract_emails"]["email"]["matches"]
+    1
+    """
+    with _METRICS_LOCK:
+        return {
+            name: {
+                label: {**stats, "latency_buckets": list(stats["latency_buckets"])}
+                for label, stats in patterns.items()
+            }
+            for name, patterns in _METRICS.items()
+        }
+
+def reset_metrics():
+    """Drop every recorded metric."""
+    with _METRICS_LOCK:
+        for patterns in _METRICS.values():
+            patterns.clear()
+
+def _prometheus_label(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def metrics_prometheus(prefix="text_analyzer"):
+    """Return the recorded metrics in the Prometheus text exposition format."""
+    snapshot = metrics()
+    counters = (
+        ("calls", "calls_total", "Calls per function and pattern."),
+        ("errors", "errors_total", "Calls that raised an exception."),
+        ("input_chars", "input_chars_total", "Characters of input text processed."),
+        ("matches", "matches_total", "Matches returned."),
+    )
+    lines = []
+    for key, suffix, help_text in counters:
+        lines.append(f"# HELP {prefix}_{suffix} {help_text}")
+        lines.append(f"# TYPE {prefix}_{suffix} counter")
+        for name, patterns in snapshot.items():
+            for label, stats in patterns.items():
+                lines.append(f'{prefix}_{suffix}{{function="{name}",pattern="{_prometheus_label(label)}"}} {stats[key]}')
+    lines.append(f"# HELP {prefix}_latency_seconds Call latency.")
+    lines.append(f"# TYPE {prefix}_latency_seconds histogram")
+    for name, patterns in snapshot.items():
+        for label, stats in patterns.items():
+            labels = f'function="{name}",pattern="{_prometheus_label(label)}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), stats["latency_buckets"]):
+                cumulative += count
+                lines.append(f'{prefix}_latency_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{prefix}_latency_seconds_sum{{{labels}}} {stats['latency_sum']}")
+            lines.append(f"{prefix}_latency_seconds_count{{{labels}}} {stats['calls']}")
+    return "\n".join(lines) + "\n"
+
+def main():
+    """
+    Main function to demonstrate the functionality of the Text Pattern Matcher.
+    """
+    print("===== TEXT PATTERN MATCHER =====")
+    
+    # Sample text with various patterns to detect
+    sample_text = """
+    Contact Information:
+    - Email: john.doe@example.com
+    - Phone: (555) 123-4567
+    - Alt Phone: 555-987-6543
+    - IP Address: 192.168.1.1
+    
+    Important Dates:
+    - Start Date: 01/15/2023
+    - End Date: 12/31/2023
+    - Update Released: 2023-06-15
+    """
+    
+    # 1. Email extraction and validation
+    print("\n--- Emails ---")
+    emails = extract_emails(sample_text)
+    print(f"Found {len(emails)} email addresses: {', '.join(emails)}")
+    for email in emails + ["invalid-email"]:
+        print(f"  {email}: {'valid' if validate_email(email) else 'invalid'}")
+    
+    # 2. Phone number extraction and validation
+    print("\n--- Phone Numbers ---")
+    phones = extract_phone_numbers(sample_text)
+    print(f"Found {len(phones)} phone numbers: {', '.join(phones)}")
+    for phone in phones + ["555-1234"]:
+        print(f"  {phone}: {'valid' if validate_phone_number(phone) else 'invalid'}")
+    
+    # 3. Date extraction (both MM/DD/YYYY and YYYY-MM-DD formats)
+    print("\n--- Dates ---")
+    for date_format in DATE_PATTERNS:
+        dates = extract_dates(sample_text, date_format)
+        print(f"Found {len(dates)} {date_format} dates: {', '.join(dates)}")
+    
+    # 4. IP address extraction and validation
+    print("\n--- IP Addresses ---")
+    ips = extract_ip_addresses(sample_text)
+    print(f"Found {len(ips)} IP addresses: {', '.join(ips)}")
+    for ip in ips + ["256.0.0.1"]:
+        print(f"  {ip}: {'valid' if validate_ip_address(ip) else 'invalid'}")
+    
     # 5. Pattern replacement example
+    print("\n--- Redaction ---")
+    redacted = replace_pattern(sample_text, EMAIL_PATTERN, "[EMAIL]")
+    redacted = replace_pattern(redacted, PHONE_PATTERN, "[PHONE]")
+    print(redacted)
     
     print("\n===== PATTERN MATCHING COMPLETE =====")
 
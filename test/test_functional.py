@@ -1,6 +1,17 @@
 import pytest
 import inspect
+import asyncio
+import io
+import os
+import pathlib
 import re
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from collections import Counter
+import digital_communications_analyzer as analyzer
 from digital_communications_analyzer import (
     extract_emails,
     extract_phone_numbers,
@@ -9,10 +20,61 @@ from digital_communications_analyzer import (
     validate_email,
     validate_phone_number,
     validate_ip_address,
-    replace_pattern
+    replace_pattern,
+    extract_all,
+    get_pattern,
+    PatternCache,
+    iter_emails,
+    iter_phone_numbers,
+    iter_dates,
+    iter_ip_addresses,
+    MappedFile,
+    analyze_corpus,
+    prefilter_stats,
+    reset_prefilter_stats,
+    validate_emails_many,
+    validate_phone_numbers_many,
+    validate_ip_addresses_many,
+    scan_ip_addresses,
+    extract_emails_spans,
+    extract_phone_numbers_spans,
+    extract_dates_spans,
+    extract_ip_addresses_spans,
+    Redactor,
+    check_pattern_safety,
+    UnsafePatternError,
+    PatternTimeoutError,
+    count_emails,
+    count_phone_numbers,
+    count_dates,
+    count_ip_addresses,
+    StreamSummary,
+    summarize,
+    analyze_document,
+    AsyncAnalyzer,
+    analyze,
+    areplace_pattern,
+    aiter_emails,
+    normalize_phone_number,
+    normalize_date,
+    scan_emails,
+    scan_phone_numbers,
+    scan_dates,
+    EntityIndex,
+    ResultCache,
+    pattern_set_version,
+    register_regex_backend,
+    set_regex_backend,
+    get_regex_backend,
+    unregister_regex_backend
 )
 from test.TestUtils import TestUtils
 
+# Characters per second the phone and date extractors must sustain on
+# worst-case numeric input; about a fifth of the slowest case measured by
+# benchmark.py --worst-case
+NUMERIC_THROUGHPUT_FLOOR = 2_000_000
+
 
 class TestFunctional:
     """Test cases for regex functionality in the text pattern matcher."""
@@ -134,6 +196,44 @@ class TestFunctional:
             TestUtils.yakshaAssert("test_ip_functionality", False, "functional")
             raise e
     
+    def test_ip_valid_only(self):
+        """Test IP extraction restricted to addresses with octets in range."""
+        try:
+            mixed_text = "Hosts: 192.168.1.1, 256.1.1.1, 10.0.0.999, 0.0.0.0"
+            assert extract_ip_addresses(mixed_text, valid_only=True) == ["192.168.1.1", "0.0.0.0"], "Should only return IPs with octets in range"
+            assert extract_ip_addresses(mixed_text) == ["192.168.1.1", "256.1.1.1", "10.0.0.999", "0.0.0.0"], "Should return all IPs by default"
+            
+            TestUtils.yakshaAssert("test_ip_valid_only", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_ip_valid_only", False, "functional")
+            raise e
+    
+    def test_ip_scanner(self):
+        """Test the non-regex IP scanner engine against the regex engine."""
+        try:
+            samples = [
+                "IPs: 192.168.1.1, 10.0.0.1, 127.0.0.1",
+                "Boundaries: 0.0.0.0, 255.255.255.255",
+                "Hosts: 192.168.1.1, 256.1.1.1, 10.0.0.999, 0.0.0.0",
+                "1.2.3.4.5 1.2.3.4567 a1.2.3.4 1.2.3.4_ 01.02.03.04",
+            ]
+            for sample in samples:
+                assert extract_ip_addresses(sample, engine="scanner") == extract_ip_addresses(sample), "Scanner should match regex engine"
+                assert extract_ip_addresses(sample, True, "scanner") == extract_ip_addresses(sample, True), "Scanner should match valid_only results"
+            for candidate in ["192.168.1.1", "256.0.0.0", "192.168.1", "a.b.c.d", "1.2.3.4\n", ""]:
+                assert validate_ip_address(candidate, engine="scanner") is validate_ip_address(candidate), "Scanner validation should match regex validation"
+            assert list(scan_ip_addresses(samples[2], packed=True)) == [3232235777, 0], "Should pack valid IPs as 32-bit integers"
+            try:
+                extract_ip_addresses(samples[0], engine="unknown")
+                assert False, "Should raise ValueError for unknown engines"
+            except ValueError:
+                pass
+            
+            TestUtils.yakshaAssert("test_ip_scanner", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_ip_scanner", False, "functional")
+            raise e
+    
     def test_pattern_replacement(self):
         """Test pattern replacement functionality."""
         try:
@@ -187,6 +287,783 @@ class TestFunctional:
             TestUtils.yakshaAssert("test_error_handling", False, "functional")
             raise e
     
+    def test_extract_all_functionality(self):
+        """Test single-pass extraction matches the individual extractors."""
+        try:
+            text = ("Mail admin@test.org or 5551234567@vtext.com, call (123) 456-7890, "
+                    "from 10.0.0.1 on 01/15/2023 and 2023-06-15 (report-2023-01-15@x.com)")
+            results = extract_all(text)
+            assert results["emails"] == extract_emails(text), "Should match extract_emails"
+            assert results["phone_numbers"] == extract_phone_numbers(text), "Should match extract_phone_numbers"
+            assert results["us_dates"] == extract_dates(text, "MM/DD/YYYY"), "Should match US date extraction"
+            assert results["iso_dates"] == extract_dates(text, "YYYY-MM-DD"), "Should match ISO date extraction"
+            assert results["ip_addresses"] == extract_ip_addresses(text), "Should match extract_ip_addresses"
+            assert "5551234567" in results["phone_numbers"], "Should keep phone numbers found inside emails"
+            assert "2023-01-15" in results["iso_dates"], "Should keep dates found inside emails"
+            
+            assert extract_all("") == {"emails": [], "iso_dates": [], "us_dates": [], "ip_addresses": [], "phone_numbers": []}, "Should return empty lists for empty input"
+            try:
+                extract_all(None)
+                assert False, "extract_all should raise TypeError for None input"
+            except TypeError:
+                pass
+            
+            TestUtils.yakshaAssert("test_extract_all_functionality", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_extract_all_functionality", False, "functional")
+            raise e
+    
+    def test_pattern_registry(self):
+        """Test the registry of precompiled built-in patterns."""
+        try:
+            assert get_pattern("email") is get_pattern("email"), "Should compile each pattern only once"
+            assert get_pattern("ip").findall("Gateway: 10.0.0.1") == ["10.0.0.1"], "Should expose compiled patterns"
+            assert get_pattern("phone_validation").match("123-456-7890"), "Should expose validation patterns"
+            try:
+                get_pattern("no-such-pattern")
+                assert False, "Should raise ValueError for unknown pattern names"
+            except ValueError:
+                pass
+            
+            TestUtils.yakshaAssert("test_pattern_registry", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_pattern_registry", False, "functional")
+            raise e
+    
+    def test_pattern_cache(self):
+        """Test the LRU cache of compiled replace_pattern patterns."""
+        try:
+            cache = PatternCache(maxsize=2)
+            first = cache.get(r'\d+')
+            assert cache.get(r'\d+') is first, "Should reuse compiled patterns"
+            cache.get(r'[a-z]+')
+            cache.get(r'\s+')
+            info = cache.info()
+            assert (info["hits"], info["misses"], info["evictions"]) == (1, 3, 1), "Should count hits, misses and evictions"
+            assert info["size"] == 2, "Should stay within maxsize"
+            cache.get(r'\d+')
+            assert cache.info()["misses"] == 4, "Should have evicted the least recently used pattern"
+            
+            compiled = re.compile(r'\d{3}-\d{2}-\d{4}')
+            assert replace_pattern("SSN 123-45-6789", compiled, "XXX-XX-XXXX") == "SSN XXX-XX-XXXX", "Should accept precompiled patterns"
+            
+            TestUtils.yakshaAssert("test_pattern_cache", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_pattern_cache", False, "functional")
+            raise e
+    
+    def test_streaming_extraction(self):
+        """Test chunked streaming extraction across chunk boundaries."""
+        try:
+            text = ("Mail admin@test.org or complex.email+chars123@domain-name.co.uk, "
+                    "call (123) 456-7890 or 555.987.6543 from 192.168.1.1 on 1/15/2023 and 2023-06-15")
+            for chunk_size in (1, 3, 7, 64):
+                assert list(iter_emails(io.StringIO(text), chunk_size)) == extract_emails(text), "Should stream emails"
+                assert list(iter_phone_numbers(io.StringIO(text), chunk_size)) == extract_phone_numbers(text), "Should stream phone numbers"
+                assert list(iter_dates(io.StringIO(text), "MM/DD/YYYY", chunk_size)) == extract_dates(text), "Should stream US dates"
+                assert list(iter_dates(io.StringIO(text), "YYYY-MM-DD", chunk_size)) == extract_dates(text, "YYYY-MM-DD"), "Should stream ISO dates"
+                assert list(iter_ip_addresses(io.StringIO(text), chunk_size)) == extract_ip_addresses(text), "Should stream IPs"
+            
+            # Iterables of chunks split a match in the middle
+            assert list(iter_ip_addresses(["Server 192.16", "8.1.1 up"])) == ["192.168.1.1"], "Should join matches split across chunks"
+            assert list(iter_ip_addresses(["Server 1.2.3.4", "567 up"])) == [], "Should not emit partial matches at a boundary"
+            
+            try:
+                iter_dates(io.StringIO(text), "INVALID-FORMAT")
+                assert False, "Should raise ValueError for invalid format"
+            except ValueError:
+                pass
+            try:
+                list(iter_emails(io.BytesIO(b"a@b.com")))
+                assert False, "Should raise TypeError for binary streams"
+            except TypeError:
+                pass
+            
+            TestUtils.yakshaAssert("test_streaming_extraction", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_streaming_extraction", False, "functional")
+            raise e
+    
+    def test_mapped_file_extraction(self):
+        """Test bytes-mode extraction over a memory-mapped file."""
+        try:
+            text = "Mail admin@test.org, call (123) 456-7890 from 192.168.1.1 on 1/15/2023 and 2023-06-15\n"
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "sample.log")
+                with open(path, "w") as handle:
+                    handle.write(text)
+                with MappedFile(path) as mapped:
+                    spans = list(mapped.iter_spans("ip_addresses"))
+                    assert [text[start:end] for start, end in spans] == extract_ip_addresses(text), "Should return IP offsets"
+                    views = [bytes(view) for view in mapped.iter_views("emails")]
+                    assert views == [b"admin@test.org"], "Should return email views"
+                    assert len(list(mapped.iter_spans("iso_dates"))) == 1, "Should find ISO dates"
+                    try:
+                        list(mapped.iter_spans("unknown"))
+                        assert False, "Should raise ValueError for unknown kinds"
+                    except ValueError:
+                        pass
+                
+                empty_path = os.path.join(directory, "empty.log")
+                open(empty_path, "w").close()
+                with MappedFile(empty_path) as mapped:
+                    assert list(mapped.iter_spans("emails")) == [], "Should handle empty files"
+            
+            TestUtils.yakshaAssert("test_mapped_file_extraction", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_mapped_file_extraction", False, "functional")
+            raise e
+    
+    def test_corpus_analysis(self):
+        """Test batch analysis of a corpus in worker processes."""
+        try:
+            documents = [f"Mail user{i}@test.org from 10.0.0.{i} or 999.0.0.{i}" for i in range(7)]
+            in_process = list(analyze_corpus(documents, workers=1))
+            pooled = list(analyze_corpus(documents, workers=2, batch_size=2))
+            assert pooled == in_process, "Should return the same results in input order"
+            assert pooled[3]["emails"] == ["user3@test.org"], "Should extract emails per document"
+            assert pooled[3]["valid_ip_addresses"] == ["10.0.0.3"], "Should validate extracted IPs"
+            assert list(analyze_corpus([])) == [], "Should handle empty corpora"
+            
+            try:
+                analyze_corpus(documents, workers=0)
+                assert False, "Should raise ValueError for workers < 1"
+            except ValueError:
+                pass
+            
+            TestUtils.yakshaAssert("test_corpus_analysis", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_corpus_analysis", False, "functional")
+            raise e
+    
+    def test_prefilters(self):
+        """Test literal prefilters that skip regex work on hopeless inputs."""
+        try:
+            reset_prefilter_stats()
+            assert extract_emails("No addresses in this message") == [], "Should return empty list when prefilter fails"
+            assert extract_ip_addresses("No addresses in this message") == [], "Should return empty list when prefilter fails"
+            assert extract_dates("Released on 2023-05-25", "MM/DD/YYYY") == [], "Should skip US dates without '/'"
+            assert extract_dates("Released on 2023-05-25", "YYYY-MM-DD") == ["2023-05-25"], "Should still extract when prefilter passes"
+            stats = prefilter_stats()
+            assert stats["email"]["skipped"] == 1 and stats["email"]["skip_rate"] == 1.0, "Should count email skips"
+            assert stats["ip"]["skipped"] == 1, "Should count IP skips"
+            assert stats["us_date"]["skipped"] == 1, "Should count US date skips"
+            assert stats["iso_date"] == {"checks": 1, "skipped": 0, "skip_rate": 0.0}, "Should count prefilter passes"
+            
+            TestUtils.yakshaAssert("test_prefilters", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_prefilters", False, "functional")
+            raise e
+    
+    def test_bulk_validation(self):
+        """Test bulk validators against the single-value validators."""
+        try:
+            emails = ["user@example.com", "invalid-email", "user123@domain-name.co.uk", ""]
+            phones = ["(123) 456-7890", "555-1234", "1234567890", "123-456-789a"]
+            ips = ["192.168.1.1", "256.0.0.1", "0.0.0.0", "255.255.255.255", "192.168.1", "a.b.c.d", "010.001.1.1", "1.2.3.4\n"]
+            assert validate_emails_many(emails) == bytearray(map(validate_email, emails)), "Should match validate_email"
+            assert validate_phone_numbers_many(phones) == bytearray(map(validate_phone_number, phones)), "Should match validate_phone_number"
+            assert validate_ip_addresses_many(ips) == bytearray(map(validate_ip_address, ips)), "Should match validate_ip_address"
+            assert validate_ip_addresses_many(ips[:7]) == bytearray([1, 0, 1, 1, 0, 0, 1]), "Should range-check octets in the joined scan"
+            assert validate_ip_addresses_many([]) == bytearray(), "Should handle empty input"
+            
+            try:
+                validate_ip_addresses_many(["1.1.1.1", None])
+                assert False, "Should raise TypeError for non-string values"
+            except TypeError as e:
+                assert "string" in str(e).lower()
+            
+            TestUtils.yakshaAssert("test_bulk_validation", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_bulk_validation", False, "functional")
+            raise e
+    
+    def test_integer_output_modes(self):
+        """Test compact integer output for IPs, phone numbers and dates."""
+        try:
+            text = ("Call (123) 456-7890 or 555.987.6543 on 1/15/2023, 02/30/2023 and 2023-06-15 "
+                    "from 192.168.1.1, 999.1.1.1 and 10.0.0.1")
+            assert list(extract_ip_addresses(text, output="int")) == [3232235777, 167772161], "Should pack valid IPs as uint32"
+            assert list(extract_ip_addresses(text, engine="scanner", output="int")) == [3232235777, 167772161], "Scanner should pack the same IPs"
+            assert list(extract_phone_numbers(text, output="int")) == [1234567890, 5559876543], "Should normalize phones to 10-digit integers"
+            assert list(extract_dates(text, output="int")) == [19372], "Should convert real US dates to days since epoch"
+            assert list(extract_dates(text, "YYYY-MM-DD", output="int")) == [19523], "Should convert ISO dates to days since epoch"
+            assert extract_ip_addresses(text, output="int").itemsize == 4, "Should use 32-bit storage for IPs"
+            assert len(extract_dates("", output="int")) == 0, "Should return an empty array for empty input"
+            try:
+                extract_phone_numbers(text, output="bytes")
+                assert False, "Should raise ValueError for unknown output modes"
+            except ValueError:
+                pass
+            
+            TestUtils.yakshaAssert("test_integer_output_modes", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_integer_output_modes", False, "functional")
+            raise e
+    
+    def test_match_spans(self):
+        """Test span extraction and lazy match views."""
+        try:
+            text = "Mail admin@test.org or info@company.net, call 555-987-6543 from 10.0.0.1 on 1/15/2023 and 2023-06-15"
+            spans = extract_emails_spans(text)
+            assert len(spans) == 2, "Should locate both emails"
+            assert list(spans.spans()) == [(5, 19), (23, 39)], "Should return match offsets"
+            assert spans[1] == "info@company.net" and spans[-1] == "info@company.net", "Should slice matches on access"
+            assert list(spans) == extract_emails(text), "Should iterate the same matches as extract_emails"
+            assert list(extract_phone_numbers_spans(text)) == extract_phone_numbers(text), "Should locate phone numbers"
+            assert list(extract_dates_spans(text, "YYYY-MM-DD")) == extract_dates(text, "YYYY-MM-DD"), "Should locate ISO dates"
+            assert list(extract_ip_addresses_spans(text)) == extract_ip_addresses(text), "Should locate IPs"
+            assert len(extract_dates_spans("no dates")) == 0, "Should handle text without matches"
+            try:
+                spans[2]
+                assert False, "Should raise IndexError past the last match"
+            except IndexError:
+                pass
+            
+            TestUtils.yakshaAssert("test_match_spans", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_match_spans", False, "functional")
+            raise e
+    
+    def test_redactor(self):
+        """Test single-pass multi-rule redaction."""
+        try:
+            redactor = Redactor([
+                ("email", r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', "[EMAIL]"),
+                ("ssn", r'\d{3}-\d{2}-(?P<last>\d{4})', r"XXX-XX-\g<last>"),
+                ("phone", r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}', "[PHONE]"),
+            ])
+            text = "Mail admin@example.com or support@example.com, SSN 123-45-6789, call (555) 123-4567"
+            assert redactor.redact(text) == "Mail [EMAIL] or [EMAIL], SSN XXX-XX-6789, call [PHONE]", "Should apply every rule in one pass"
+            assert redactor.hits == {"email": 2, "ssn": 1, "phone": 1}, "Should count hits per rule"
+            redactor.redact("No PII here")
+            assert redactor.hits["email"] == 2, "Should accumulate hit counts"
+            
+            shared = Redactor([
+                ("card", r'\d{4}-\d{4}-(?P<last>\d{4})', r"****-****-\g<last>"),
+                ("ssn", r'\d{3}-\d{2}-(?P<last>\d{4})', r"XXX-XX-\g<last>"),
+                ("echo", r'(?P<last>[a-z])(?P=last)', r"<\g<last>>"),
+            ])
+            assert shared.redact("Card 1234-5678-9012, SSN 123-45-6789, zz") == \
+                "Card ****-****-9012, SSN XXX-XX-6789, <z>", "Rules should be able to reuse group names"
+            
+            flagged = Redactor([
+                ("secret", r'(?i)secret', "[SECRET]"),
+                ("token", r'(?x) tok \d+  # a trailing comment', "[TOKEN]"),
+                ("name", r'\b[a-z]+ton\b', "[NAME]"),
+            ])
+            assert flagged.redact("SECRET and Secret, tok42, Boston boston") == \
+                "[SECRET] and [SECRET], [TOKEN], Boston [NAME]", "Global inline flags should apply to their own rule only"
+            
+            numbered = Redactor([
+                ("double", r'\b(\w+) \1\b', r"\1"),
+                ("tag", r'<(\w+)>[^<]*</\1>', "[TAG]"),
+                ("quoted", r'(")?q(?(1)")', "[Q]"),
+            ])
+            assert numbered.redact('the the cat <b>x</b> <i>y</b> "q" q') == \
+                'the cat [TAG] <i>y</b> [Q] [Q]', "Numbered backreferences and conditionals should keep their groups"
+            
+            for bad_rules in ([("a", "(invalid[regex", "x")], []):
+                try:
+                    Redactor(bad_rules)
+                    assert False, "Should raise ValueError for unusable rules"
+                except ValueError:
+                    pass
+            
+            TestUtils.yakshaAssert("test_redactor", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_redactor", False, "functional")
+            raise e
+    
+    def test_pattern_safety(self):
+        """Test the backtracking screen and time budget for user patterns."""
+        try:
+            for unsafe in (r'(a+)+$', r'(\w+\s?)*$', r'(?:a*)*b', r'(?x) ( a + ) + $', r'(a|aa)*c',
+                           r'(?:\s*,\s*)+$', r'(.*a){5}'):
+                try:
+                    check_pattern_safety(unsafe)
+                    assert False, f"Should reject the ambiguous repeat in {unsafe}"
+                except UnsafePatternError:
+                    pass
+            for safe in (get_pattern("email"), r'(a|b)*', r'(\d{3})+', r'(?>a+)+', r'\(a+\)+', r'[(a+)]+',
+                         r'(\w++\s?)*$', r'(a+)+'):
+                check_pattern_safety(safe)
+            
+            text = "Mail a.b@mail.example.com, c@d.org ,  e@f.net from 10.0.0.1"
+            for ordinary in (r'(\w+\.)+\w+', r'[\w.+-]+@(\w+\.)+\w{2,}', r'(\d+\.)+', r'(?:\s*,\s*)+', r'((ab)*c)*'):
+                check_pattern_safety(ordinary)
+                assert replace_pattern(text, ordinary, "#") == re.sub(ordinary, "#", text), \
+                    f"Should run the ordinary pattern {ordinary}"
+            
+            try:
+                replace_pattern("aaaa", r'(a+)+$', "x")
+                assert False, "replace_pattern should screen patterns"
+            except ValueError:
+                pass
+            assert replace_pattern("aaaa", r'(a+)+$', "x", allow_unsafe=True) == "x", "Should allow opting out of the screen"
+            try:
+                Redactor([("run", r'(a*)*b', "x")])
+                assert False, "Redactor should screen rule patterns"
+            except UnsafePatternError:
+                pass
+            
+            screened = []
+            find_unsafe_repeat = analyzer._find_unsafe_repeat
+            analyzer._find_unsafe_repeat = lambda pattern, flags: screened.append(pattern) or find_unsafe_repeat(pattern, flags)
+            analyzer.PATTERN_CACHE.resize(1000)
+            try:
+                patterns = [f"x{i}\\d+" for i in range(300)]
+                for _ in range(2):
+                    for pattern in patterns:
+                        assert replace_pattern("x7 x71", pattern, "#") == re.sub(pattern, "#", "x7 x71"), \
+                            "Should replace with every cached pattern"
+                    try:
+                        replace_pattern("aaaa", r'(b+)+$', "x")
+                        assert False, "Should keep rejecting a cached unsafe pattern"
+                    except UnsafePatternError:
+                        pass
+                assert sorted(screened) == sorted(patterns + [r'(b+)+$']), "Should screen each cached pattern once"
+            finally:
+                analyzer._find_unsafe_repeat = find_unsafe_repeat
+                analyzer.PATTERN_CACHE.resize(256)
+            
+            assert replace_pattern("a1b2", r'\d', "#", timeout=5) == "a#b#", "Should replace within the time budget"
+            start = time.perf_counter()
+            try:
+                replace_pattern("a" * 40 + "b", r'(a|aa)*c', "x", timeout=0.2, allow_unsafe=True)
+                assert False, "Should raise PatternTimeoutError on overrun"
+            except PatternTimeoutError:
+                pass
+            assert time.perf_counter() - start < 5, "Should stop the replacement at the time budget"
+            
+            TestUtils.yakshaAssert("test_pattern_safety", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_pattern_safety", False, "functional")
+            raise e
+    
+    def test_counting_and_summaries(self):
+        """Test exact counting extractors and approximate stream summaries."""
+        try:
+            text = "a@x.com b@x.com a@x.com 10.0.0.1 999.0.0.1 10.0.0.1"
+            assert count_emails(text) == {"a@x.com": 2, "b@x.com": 1}, "Should count each distinct email"
+            assert count_ip_addresses(text, valid_only=True) == {"10.0.0.1": 2}, "Should count valid IPs only"
+            
+            mixed = ("Call 555-123-4567 or (555) 123-4567 and 555-123-4567 on 1/15/2023, 2023-01-15 "
+                     "and 1/15/2023 from 10.0.0.1, 256.1.1.1 to a@x.com ") * 3
+            originals = {name: getattr(analyzer, name) for name in
+                         ("extract_emails", "extract_phone_numbers", "extract_dates", "extract_ip_addresses")}
+            expected = [Counter(extract(mixed)) for extract in originals.values()]
+            expected += [Counter(extract_dates(mixed, "YYYY-MM-DD")), Counter(extract_ip_addresses(mixed, valid_only=True))]
+            def unused(*args, **kwargs):
+                raise AssertionError("Counting should not build the list of matches")
+            for name in originals:
+                setattr(analyzer, name, unused)
+            try:
+                counted = [count_emails(mixed), count_phone_numbers(mixed), count_dates(mixed), count_ip_addresses(mixed),
+                           count_dates(mixed, "YYYY-MM-DD"), count_ip_addresses(mixed, valid_only=True)]
+            finally:
+                for name, extract in originals.items():
+                    setattr(analyzer, name, extract)
+            assert counted == expected, "Should count the same matches the extractors return"
+            
+            values = [f"user{i % 500}@x.com" for i in range(20000)] + ["hot@x.com"] * 5000
+            summary = StreamSummary(top_k=20)
+            summary.update(values[:12000])
+            other = StreamSummary(top_k=20)
+            other.update(values[12000:])
+            summary.merge(other)
+            assert summary.total == 25000, "Should count every value"
+            assert summary.top(1)[0][0] == "hot@x.com", "Should keep the heaviest hitter"
+            value, count, error = summary.top(1)[0]
+            assert count - error <= 5000 <= count, "Top counts should bound the true count"
+            assert abs(summary.distinct() - 501) <= 10, "Should estimate the distinct count"
+            assert summary.estimate("hot@x.com") >= 5000, "Count-Min estimates should never undercount"
+            
+            streamed = summarize(io.StringIO((text + " ") * 100), "emails", chunk_size=7)
+            assert streamed.top() == [("a@x.com", 200, 0), ("b@x.com", 100, 0)], "Should summarize a stream"
+            
+            TestUtils.yakshaAssert("test_counting_and_summaries", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_counting_and_summaries", False, "functional")
+            raise e
+    
+    def test_async_api(self):
+        """Test the asyncio facade, batching and backpressure."""
+        try:
+            messages = [f"Mail user{i}@example.com from 10.0.{i % 256}.1" for i in range(500)]
+            text = " ".join(messages)
+            
+            async def run():
+                async with AsyncAnalyzer(max_workers=2, batch_size=16, max_pending=64) as analyzer:
+                    results = await asyncio.gather(*(analyze(m, analyzer) for m in messages))
+                    assert results == [analyze_document(m) for m in messages], "Should match analyze_document()"
+                    assert all(len(state["batch"]) == 0 for state in analyzer._loops.values()), "Should flush every batch"
+                    
+                    redacted = await areplace_pattern("a@b.com", r'\w+@\w+\.com', "[EMAIL]", analyzer=analyzer)
+                    assert redacted == "[EMAIL]", "Should run replace_pattern on the executor"
+                    try:
+                        await areplace_pattern("aaa", r'(a+)+$', "x", analyzer=analyzer)
+                        assert False, "Should re-raise worker exceptions"
+                    except ValueError:
+                        pass
+                    
+                    async def chunks():
+                        for i in range(0, len(text), 1000):
+                            yield text[i:i + 1000].encode("utf-8")
+                    emails = [email async for email in aiter_emails(chunks(), chunk_size=4096, analyzer=analyzer)]
+                    assert emails == extract_emails(text), "Should stream matches from an async byte source"
+            
+            asyncio.run(run())
+            
+            TestUtils.yakshaAssert("test_async_api", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_async_api", False, "functional")
+            raise e
+    
+    def test_normalization(self):
+        """Test canonical phone and date output computed from match groups."""
+        try:
+            text = "Call (123) 456-7890, 123.456.7890 or 1234567890 on 1/1/2023, 01/01/2023, 2/30/2023 and 2024-2-29"
+            assert extract_phone_numbers(text, output="normalized") == ["+11234567890"] * 3, "Should give E.164-style phones"
+            assert extract_dates(text, output="normalized") == ["2023-01-01", "2023-01-01"], "Should give ISO dates and drop impossible ones"
+            assert extract_dates(text, "YYYY-MM-DD", output="normalized") == ["2024-02-29"], "Should accept leap days"
+            
+            assert normalize_phone_number("555.987.6543") == "+15559876543", "Should normalize a single phone"
+            assert normalize_phone_number("555-1234") is None, "Should reject invalid phones"
+            for phone in ("555-123-4567\n", "555-123-4567\n\n", " 555-123-4567", "555-123-4567 "):
+                assert (normalize_phone_number(phone) is not None) == validate_phone_number(phone, backend="re"), \
+                    f"Should accept exactly what validate_phone_number does: {phone!r}"
+            assert normalize_date("12/31/2023") == "2023-12-31", "Should normalize a single date"
+            assert normalize_date("2023-13-01", format="YYYY-MM-DD") is None, "Should validate the calendar"
+            try:
+                extract_ip_addresses(text, output="normalized")
+                assert False, "IP extraction has no normalized mode"
+            except ValueError:
+                pass
+            
+            TestUtils.yakshaAssert("test_normalization", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_normalization", False, "functional")
+            raise e
+    
+    def test_instrumentation(self):
+        """Test opt-in per-function metrics and their exports."""
+        try:
+            original = analyzer.extract_emails
+            analyzer.reset_metrics()
+            analyzer.enable_instrumentation()
+            try:
+                analyzer.extract_emails("a@b.com and c@d.org")
+                analyzer.extract_dates("2023-01-02", format="YYYY-MM-DD")
+                analyzer.validate_ip_address("10.0.0.1")
+                analyzer.replace_pattern("a1", r'\d', "#")
+                try:
+                    analyzer.extract_emails(None)
+                except TypeError:
+                    pass
+            finally:
+                analyzer.disable_instrumentation()
+            assert analyzer.extract_emails is original, "Should restore the original functions"
+            analyzer.extract_emails("x@y.com")
+            
+            stats = analyzer.metrics()
+            emails = stats["extract_emails"]["email"]
+            assert (emails["calls"], emails["errors"], emails["matches"]) == (2, 1, 2), "Should count calls, errors and matches"
+            assert emails["input_chars"] == 19, "Should count input size"
+            assert sum(emails["latency_buckets"]) == 2, "Should record a latency per call"
+            assert stats["extract_dates"]["iso_date"]["calls"] == 1, "Should label calls by pattern"
+            assert stats["replace_pattern"]["\\d"]["calls"] == 1, "Should label replace_pattern by its pattern"
+            
+            text = analyzer.metrics_prometheus()
+            assert 'text_analyzer_calls_total{function="extract_emails",pattern="email"} 2' in text, "Should export counters"
+            assert 'le="+Inf"} 2' in text, "Should export cumulative histograms"
+            analyzer.reset_metrics()
+            assert analyzer.metrics()["extract_emails"] == {}, "Should reset metrics"
+            
+            TestUtils.yakshaAssert("test_instrumentation", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_instrumentation", False, "functional")
+            raise e
+    
+    def test_lazy_import(self):
+        """Test that importing the module compiles nothing and loads no optional modules."""
+        try:
+            probe = (
+                "import sys\n"
+                "import digital_communications_analyzer as analyzer\n"
+                "heavy = ['asyncio', 'concurrent.futures', 'multiprocessing', 'datetime', 'hashlib', 'inspect', 'mmap', 'sqlite3']\n"
+                "print(len(analyzer.PATTERNS), *[name for name in heavy if name in sys.modules])\n"
+            )
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+            output = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True,
+                                    env=env, check=True).stdout.split()
+            assert output[0] == "0", "No pattern should be compiled at import"
+            assert output[1:] == [], f"Optional modules should not load at import: {output[1:]}"
+            
+            TestUtils.yakshaAssert("test_lazy_import", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_lazy_import", False, "functional")
+            raise e
+    
+    def test_email_scanner(self):
+        """Test the linear-time email scanner against the regex engine."""
+        try:
+            text = ("x@y.com_z@w.org a@b.com.x@y.org 5551234567@vtext.com @no.tld user@localhost "
+                    "a@bb.c1.de __@x.io first.last+tag@sub.domain-name.co.uk")
+            expected = extract_emails(text, engine="regex")
+            assert scan_emails(text) == expected, "Scanner should match the regex engine"
+            assert extract_emails(text) == expected, "extract_emails should default to the scanner"
+            dense = " ".join(f"u{i}@h{i}.com" for i in range(200))
+            assert extract_emails(dense) == extract_emails(dense, engine="regex"), "Should match on dense input"
+            
+            run = "a." * 50000 + "a@b.com"
+            start = time.perf_counter()
+            assert extract_emails(run) == ["a." * 50000 + "a@b.com"], "Should match after a long username run"
+            assert extract_emails("ab" * 50000) == [], "Should not match without an @"
+            assert time.perf_counter() - start < 1, "Scanner should stay linear on long runs"
+            assert extract_all(run)["emails"] == [run], "extract_all should use the scanner"
+            
+            TestUtils.yakshaAssert("test_email_scanner", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_email_scanner", False, "functional")
+            raise e
+    
+    def test_digit_run_scanner(self):
+        """Test the digit-run scanner against the regex engine and its throughput floor."""
+        try:
+            text = ("Call 555-123-4567 or (555) 987 6543, ref 12 34 56 78 90 and 1234567890123; "
+                    "dates 1/2/2023, 12/31/1999x, 1/2/20233 2023-1-12 2023-01-02_ 1999-12-31\n"
+                    "hex 0a1b 2c3d 4e5f 6789 csv 12345,67890 id 1Z9999999999999999 \u0663\u0663\u0663-555-1234")
+            expected_phones = extract_phone_numbers(text, engine="regex")
+            assert scan_phone_numbers(text) == expected_phones, "Scanner should match the regex engine"
+            assert extract_phone_numbers(text) == expected_phones, "extract_phone_numbers should default to the scanner"
+            assert extract_phone_numbers(text, output="normalized") == \
+                extract_phone_numbers(text, output="normalized", engine="regex"), "Should match on normalized output"
+            for date_format in ("MM/DD/YYYY", "YYYY-MM-DD"):
+                expected_dates = extract_dates(text, date_format, engine="regex")
+                assert scan_dates(text, date_format) == expected_dates, "Scanner should match the regex engine"
+                assert extract_dates(text, date_format) == expected_dates, "extract_dates should default to the scanner"
+                assert list(extract_dates(text, date_format, output="int")) == \
+                    list(extract_dates(text, date_format, output="int", engine="regex")), "Should match on integer output"
+            assert list(extract_phone_numbers_spans(text).spans()) == \
+                [m.span() for m in re.finditer(get_pattern("phone"), text)], "Spans should come from the scanner"
+            assert len(analyzer._shape_table("phone")) < 1000, "Should classify non-ASCII characters as they turn up"
+            
+            worst_cases = [
+                "123 456 789 " * 20000,
+                "(123)456-789 " * 20000,
+                "1/22/333/44 " * 20000,
+                "12345,67890,123.45,2023\n" * 10000,
+                "1" * 200000,
+            ]
+            for worst_case in worst_cases:
+                elapsed = min(
+                    self._time_call(lambda: (extract_phone_numbers(worst_case),
+                                             extract_dates(worst_case, "MM/DD/YYYY"),
+                                             extract_dates(worst_case, "YYYY-MM-DD")))
+                    for _ in range(3)
+                )
+                assert 3 * len(worst_case) / elapsed > NUMERIC_THROUGHPUT_FLOOR, \
+                    f"Should stay above the throughput floor on {worst_case[:12]!r}"
+            
+            TestUtils.yakshaAssert("test_digit_run_scanner", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_digit_run_scanner", False, "functional")
+            raise e
+    
+    def test_entity_index(self):
+        """Test the persistent inverted index of extracted entities."""
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "entities.idx")
+                mail_path = os.path.join(directory, "mail.eml")
+                with open(mail_path, "w") as handle:
+                    handle.write("From admin@test.org via 10.0.0.1")
+                with EntityIndex(path) as index:
+                    index.add("a", "Mail admin@test.org or call 555-123-4567 from 10.0.0.1")
+                    index.add("b", "Call 555-123-4567 on 1/15/2023, twice: 555-123-4567")
+                    assert index.add_many([("c", pathlib.Path(mail_path)), (7, "Nothing to see")], workers=1) == 2, \
+                        "Should count indexed documents"
+                    assert index.lookup("emails", "admin@test.org") == ["a", "c"], "Should list documents in order"
+                    assert index.lookup("phone_numbers", "555-123-4567") == ["a", "b"], "Should list each document once"
+                    assert index.lookup("us_dates", "1/15/2023") == ["b"], "Should index dates"
+                    assert index.lookup("emails", "nobody@test.org") == [], "Should return no documents for unknown values"
+                    assert len(index) == 4 and 7 in index and "z" not in index, "Should track documents"
+                    index.add("a", "Now only 192.168.1.1")
+                    assert index.lookup("emails", "admin@test.org") == ["c"], "Re-adding should replace entities"
+                    try:
+                        index.lookup("unknown", "x")
+                        assert False, "Should raise ValueError for unknown kinds"
+                    except ValueError:
+                        pass
+                    try:
+                        index.add(1.5, "text")
+                        assert False, "Should raise TypeError for bad keys"
+                    except TypeError:
+                        pass
+                with EntityIndex(path) as index:
+                    assert index.lookup("ip_addresses", "10.0.0.1") == ["c"], "Should persist across reopening"
+                    assert index.lookup("ip_addresses", "192.168.1.1") == ["a"], "Should persist replacements"
+                    assert len(index) == 4, "Should not keep the failed addition"
+            
+            TestUtils.yakshaAssert("test_entity_index", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_entity_index", False, "functional")
+            raise e
+    
+    def test_result_cache(self):
+        """Test the content-hash result cache."""
+        try:
+            text = "Mail admin@test.org or call 555-123-4567 from 10.0.0.1 on 1/15/2023"
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "results.db")
+                with ResultCache(path) as cache:
+                    assert cache.run(extract_all, text) == extract_all(text), "Should return the result on a miss"
+                    assert cache.run(extract_all, text) == extract_all(text), "Should return the result on a hit"
+                    assert cache.run(extract_dates, text, "YYYY-MM-DD") == [], "Arguments should be part of the key"
+                    redacted = cache.run(replace_pattern, text, re.compile(r"\d"), "#")
+                    assert redacted == replace_pattern(text, r"\d", "#"), "Should cache replace_pattern"
+                    info = cache.info()
+                    assert (info["hits"], info["misses"], info["entries"]) == (1, 3, 3), "Should count hits and misses"
+                    try:
+                        cache.run(extract_phone_numbers, text, output="int")
+                        assert False, "Should raise TypeError for results that cannot be stored"
+                    except TypeError:
+                        pass
+                    try:
+                        cache.run(len, text)
+                        assert False, "Should raise ValueError for other functions"
+                    except ValueError:
+                        pass
+                with ResultCache(path) as cache:
+                    cache.run(extract_all, text)
+                    assert cache.info()["hits"] == 1, "Should persist across reopening"
+                
+                register_regex_backend("ascii", types.SimpleNamespace(
+                    compile=lambda pattern, flags=0: re.compile(pattern, flags | re.ASCII), error=re.error))
+                arabic = "call \u0663\u0663\u0663-555-1234 now"
+                try:
+                    with ResultCache(path) as cache:
+                        assert cache.run(extract_phone_numbers, arabic) == ["\u0663\u0663\u0663-555-1234"], \
+                            "Should match Unicode digits on re"
+                        set_regex_backend("ascii")
+                        try:
+                            assert cache.run(extract_phone_numbers, arabic) == [], "Should not serve results from another backend"
+                        finally:
+                            set_regex_backend("re")
+                        assert cache.run(extract_phone_numbers, arabic, backend="ascii") == [], "Should key on backend="
+                        assert cache.info()["hits"] == 1, "Should hit only for the same backend"
+                finally:
+                    unregister_regex_backend("ascii")
+                
+                version = pattern_set_version()
+                original = analyzer.PATTERN_SOURCES["email"]
+                analyzer.PATTERN_SOURCES["email"] = original + "?"
+                try:
+                    assert pattern_set_version() != version, "Version should follow the built-in patterns"
+                    with ResultCache(path) as cache:
+                        assert cache.info()["entries"] == 0, "Changing a pattern should invalidate the cache"
+                finally:
+                    analyzer.PATTERN_SOURCES["email"] = original
+                for name, change in (("_EMAIL_AT_RUN_START", "x"), ("_COMBINED_PATTERN", "x"), ("SCANNER_VERSION", 1)):
+                    original = getattr(analyzer, name)
+                    setattr(analyzer, name, original + change)
+                    try:
+                        assert pattern_set_version() != version, f"Version should follow {name}"
+                    finally:
+                        setattr(analyzer, name, original)
+                assert pattern_set_version() == version, "Version should be stable"
+                
+                with ResultCache(path, max_bytes=2000) as cache:
+                    for i in range(50):
+                        cache.run(extract_emails, f"user{i}@example.com")
+                    info = cache.info()
+                    assert info["bytes"] <= 2000 and info["evictions"] > 0, "Should evict to stay within max_bytes"
+                    assert cache.run(extract_emails, "user49@example.com") == ["user49@example.com"], \
+                        "Should keep recently used results"
+                    assert cache.info()["hits"] == 1, "Recent results should still be cached"
+            
+            TestUtils.yakshaAssert("test_result_cache", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_result_cache", False, "functional")
+            raise e
+    
+    def test_regex_backends(self):
+        """Test that the functional tests pass unchanged on every available regex backend."""
+        try:
+            compiled = []
+            def counting_compile(pattern, flags=0):
+                compiled.append(pattern)
+                return re.compile(pattern, flags)
+            register_regex_backend("counting", types.SimpleNamespace(compile=counting_compile, error=re.error))
+            try:
+                backends = ["counting"]
+                for name in ("re2", "regex"):
+                    try:
+                        set_regex_backend(name)
+                        backends.append(name)
+                    except ImportError:
+                        pass
+                    finally:
+                        set_regex_backend("re")
+                
+                text = "Mail admin@test.org or call 555-123-4567 from 10.0.0.1 and 999.1.1.1 on 1/15/2023"
+                expected = extract_all(text)
+                for name in backends:
+                    set_regex_backend(name)
+                    try:
+                        assert get_regex_backend() == name, "Should switch the default backend"
+                        for test in (self.test_email_functionality, self.test_phone_functionality,
+                                     self.test_date_functionality, self.test_pattern_replacement,
+                                     self.test_error_handling, self.test_extract_all_functionality,
+                                     self.test_bulk_validation, self.test_integer_output_modes,
+                                     self.test_redactor, self.test_normalization):
+                            test()
+                        assert extract_all(text) == expected, f"extract_all should not depend on the {name} backend"
+                        assert replace_pattern("a1b22", r"\d+", "#") == "a#b#", "Should replace on the backend"
+                        assert extract_ip_addresses(text) == ["10.0.0.1", "999.1.1.1"], "Should extract IPs"
+                        assert validate_ip_address("10.0.0.1") and not validate_ip_address("999.1.1.1"), \
+                            "Should validate octet ranges"
+                    finally:
+                        set_regex_backend("re")
+                    assert extract_emails(text, backend=name) == ["admin@test.org"], "Should accept a per-call backend"
+            finally:
+                unregister_regex_backend("counting")
+            try:
+                extract_emails("a@b.com", backend="counting")
+                assert False, "Should forget unregistered backends"
+            except ValueError:
+                pass
+            try:
+                unregister_regex_backend("re")
+                assert False, "Should not unregister the default backend"
+            except ValueError:
+                pass
+            
+            assert get_regex_backend() == "re", "Should restore the default backend"
+            assert analyzer.PATTERN_SOURCES["email"] in compiled, "Built-in patterns should compile on the backend"
+            assert r"\d+" in compiled, "User patterns should compile on the backend"
+            try:
+                set_regex_backend("pcre")
+                assert False, "Should raise ValueError for unknown backends"
+            except ValueError:
+                pass
+            try:
+                register_regex_backend("broken", object())
+                assert False, "Should raise TypeError for modules without compile()"
+            except TypeError:
+                pass
+            
+            TestUtils.yakshaAssert("test_regex_backends", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("test_regex_backends", False, "functional")
+            raise e
+    
+    def _time_call(self, func):
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+    
     def _get_regex_pattern(self, func):
         """Helper method to extract regex pattern from function source code."""
         source = inspect.getsource(func)